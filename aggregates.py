@@ -0,0 +1,150 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+def build_filter_index(df):
+    """muscle group -> exercise -> row positions, with both levels in sorted order.
+
+    Built once per data version, so the STATS selectboxes only ever look at one group.
+    """
+    positions = df.groupby(['Muscle Group', 'Exercise'], observed=True).indices
+    index = {}
+    for group, exercise in sorted(positions):
+        index.setdefault(group, {})[exercise] = positions[(group, exercise)]
+    return index
+
+
+class TrainingTimeline:
+    """The sets sorted by date, for questions about "the last N days".
+
+    Built once per data version. Window slices are two binary searches on the sorted
+    dates, and per-group set counts come from a day x muscle group running total, so
+    asking about the last 30 days costs the same however long the history is.
+    """
+
+    def __init__(self, df):
+        dated = df[df['Date'].notna()]
+        self.sets = dated.iloc[np.argsort(dated['Date'].to_numpy(), kind='stable')].set_index('Date')
+        daily = (self.sets.groupby([self.sets.index.normalize(), 'Muscle Group'], observed=True).size()
+                 .unstack(fill_value=0))
+        self.days = daily.index
+        self.groups = daily.columns
+        self.cumulative = daily.cumsum().to_numpy()
+
+    def window(self, days, end=None):
+        """Sets from the `days` days ending on `end` (default today), still date-indexed."""
+        start, stop = self._bounds(days, end)
+        dates = self.sets.index
+        return self.sets.iloc[dates.searchsorted(start):dates.searchsorted(stop)]
+
+    def group_counts(self, days=None, end=None):
+        """Sets per muscle group over the window (all history if days is None), most first."""
+        if days is None:
+            totals = self.cumulative[-1] if len(self.days) else 0
+        else:
+            start, stop = self._bounds(days, end)
+            # Running totals up to (not including) each bound; -1 means "before the first day"
+            first, last = self.days.searchsorted(start) - 1, self.days.searchsorted(stop) - 1
+            totals = ((self.cumulative[last] if last >= 0 else 0)
+                      - (self.cumulative[first] if first >= 0 else 0))
+        counts = pd.Series(totals, index=pd.Index(self.groups, name='Muscle Group'), name='count', dtype=int)
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+    @staticmethod
+    def _bounds(days, end):
+        # -> [first day, day after `end`), both at midnight
+        stop = pd.Timestamp(end if end is not None else 'today').normalize() + pd.Timedelta(days=1)
+        return stop - pd.Timedelta(days=days), stop
+
+
+def per_day_totals(rows):
+    """(muscle group, exercise, date) -> Weight (max), Volume, Sets, sorted by that index."""
+    weight = pd.to_numeric(rows['Weight'], errors='coerce')
+    reps = pd.to_numeric(rows['Reps'], errors='coerce') if 'Reps' in rows else 0
+    return (pd.DataFrame({'Muscle Group': rows['Muscle Group'], 'Exercise': rows['Exercise'],
+                          'Date': rows['Date'], 'Weight': weight, 'Volume': (weight * reps).fillna(0)})
+            .groupby(['Muscle Group', 'Exercise', 'Date'], observed=True)
+            .agg(Weight=('Weight', 'max'), Volume=('Volume', 'sum'), Sets=('Weight', 'size')))
+
+
+class DailyAggregates:
+    """(muscle group, exercise) -> date -> [max weight, volume, sets], plus an all-time best.
+
+    Registered as a SheetSync listener. A full reload only swaps in the new frame; the
+    per-day table is grouped from it in one vectorised pass the first time STATS reads it,
+    so loading never pays for it. Appended rows are folded cell by cell into a small
+    overlay that reads merge on top, and the next reload starts it over.
+    """
+
+    def __init__(self):
+        self.source = None  # frame the table is (or will be) grouped from
+        self.table = None   # per_day_totals(self.source)
+        self.best = {}      # (muscle group, exercise) -> best weight in self.table
+        self.extra = {}     # (muscle group, exercise) -> date -> [max weight, volume, sets] since then
+        self.lock = threading.Lock()
+
+    def reset(self, df):
+        with self.lock:
+            self.source, self.table, self.best, self.extra = df, None, {}, {}
+
+    def extend(self, new_rows):
+        if new_rows.empty:
+            return
+        per_day = per_day_totals(new_rows)
+        with self.lock:
+            # Only the (movement, day) cells touched by these rows are visited
+            for (group, exercise, date), w, volume, sets in zip(per_day.index, per_day['Weight'],
+                                                               per_day['Volume'], per_day['Sets']):
+                cell = self.extra.setdefault((group, exercise), {}).get(date)
+                if cell is None:
+                    self.extra[(group, exercise)][date] = [w, volume, int(sets)]
+                else:
+                    _merge(cell, w, volume, sets)
+
+    def progress(self, muscle_group, exercise):
+        key = (muscle_group, exercise)
+        table, _ = self._table()
+        with self.lock:
+            extra = dict(self.extra.get(key, {}))
+        try:
+            base = table.loc[key]
+        except KeyError:
+            base = table.iloc[:0].droplevel([0, 1])
+        if extra:
+            added = pd.DataFrame(list(extra.values()), columns=['Weight', 'Volume', 'Sets'],
+                                 index=pd.Index(list(extra), name='Date'))
+            base = (pd.concat([base, added]).groupby(level=0)
+                    .agg(Weight=('Weight', 'max'), Volume=('Volume', 'sum'), Sets=('Sets', 'sum')))
+        return base.reset_index()
+
+    def all_time_best(self, muscle_group, exercise):
+        key = (muscle_group, exercise)
+        _, best = self._table()
+        best = best.get(key)
+        with self.lock:
+            for w, _, _ in self.extra.get(key, {}).values():
+                if pd.notna(w) and (best is None or w > best): best = w
+        return best
+
+    def _table(self):
+        # -> (table, best) for the current source
+        with self.lock:
+            source, table, best = self.source, self.table, self.best
+        if table is not None:
+            return table, best
+        # Grouped outside the lock, so a reload arriving meanwhile never waits on it
+        table = per_day_totals(source if source is not None else pd.DataFrame(
+            columns=['Muscle Group', 'Exercise', 'Date', 'Weight', 'Reps']))
+        best = table['Weight'].groupby(level=[0, 1], observed=True).max().dropna().to_dict()
+        with self.lock:
+            if self.source is source and self.table is None:
+                self.table, self.best = table, best
+        return table, best
+
+
+def _merge(cell, w, volume, sets):
+    if pd.notna(w) and not w <= cell[0]: cell[0] = w
+    cell[1] += volume
+    cell[2] += int(sets)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+# Rep ranges PRs are tracked in: (lower edge, upper edge] -> label
+REP_RANGE_EDGES = [0, 3, 6, 10, 15, np.inf]
+REP_RANGE_LABELS = ['1-3', '4-6', '7-10', '11-15', '16+']
+
+
+def epley_1rm(weight, reps):
+    """weight x (1 + reps / 30); a single is its own 1RM. NaN where reps isn't positive."""
+    weight, reps = np.asarray(weight, dtype=float), np.asarray(reps, dtype=float)
+    with np.errstate(invalid='ignore'):
+        return np.where(reps > 0, np.where(reps == 1, weight, weight * (1 + reps / 30)), np.nan)
+
+
+def brzycki_1rm(weight, reps):
+    """weight x 36 / (37 - reps). The formula falls apart near 37 reps, so past 36 it is NaN."""
+    weight, reps = np.asarray(weight, dtype=float), np.asarray(reps, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where((reps > 0) & (reps < 37), weight * 36 / (37 - reps), np.nan)
+
+
+def set_metrics(df):
+    """Per-set Tonnage (weight x reps) and estimated 1RMs, in the same row order as df."""
+    weight = pd.to_numeric(df['Weight'], errors='coerce').to_numpy(dtype=float)
+    reps = pd.to_numeric(df['Reps'], errors='coerce').to_numpy(dtype=float)
+    return pd.DataFrame({
+        'Date': df['Date'].to_numpy(),
+        'Muscle Group': df['Muscle Group'].to_numpy(),
+        'Exercise': df['Exercise'].to_numpy(),
+        'Weight': weight,
+        'Reps': reps,
+        'Tonnage': weight * reps,
+        'Epley 1RM': epley_1rm(weight, reps),
+        'Brzycki 1RM': brzycki_1rm(weight, reps),
+    }, index=df.index)
+
+
+def weekly_volume(df):
+    """Sets and tonnage per (week starting Monday, muscle group)."""
+    dates = pd.to_datetime(df['Date'])
+    week = dates.dt.normalize() - pd.to_timedelta(dates.dt.dayofweek, unit='D')
+    tonnage = (pd.to_numeric(df['Weight'], errors='coerce') * pd.to_numeric(df['Reps'], errors='coerce')).fillna(0)
+    return (pd.DataFrame({'Week': week, 'Muscle Group': df['Muscle Group'], 'Tonnage': tonnage})
+            .groupby(['Week', 'Muscle Group'], observed=True)
+            .agg(Sets=('Tonnage', 'size'), Tonnage=('Tonnage', 'sum')))
+
+
+def rep_range_prs(df):
+    """Every set that beat the best weight so far for its exercise and rep range, oldest first.
+
+    One stable sort by date, then a grouped running max: a set is a PR when its weight
+    is above the running max of the sets before it in the same (exercise, rep range).
+    """
+    weight = pd.to_numeric(df['Weight'], errors='coerce')
+    reps = pd.to_numeric(df['Reps'], errors='coerce')
+    sets = pd.DataFrame({'Date': df['Date'], 'Exercise': df['Exercise'], 'Muscle Group': df['Muscle Group'],
+                         'Rep Range': pd.cut(reps, REP_RANGE_EDGES, labels=REP_RANGE_LABELS),
+                         'Weight': weight, 'Reps': reps})
+    sets = sets[weight.notna() & sets['Rep Range'].notna()]
+    sets = sets.iloc[np.argsort(sets['Date'].to_numpy(), kind='stable')]
+    keys = [sets['Exercise'], sets['Rep Range']]
+    best = sets['Weight'].groupby(keys, observed=True).cummax()
+    previous = best.groupby(keys, observed=True).shift()
+    prs = sets[previous.isna() | (sets['Weight'] > previous)]
+    return prs.assign(**{'Previous Best': previous[prs.index]})
+
+
+def current_prs(prs):
+    """The standing PR per (exercise, rep range), from rep_range_prs() output."""
+    return prs.groupby(['Exercise', 'Rep Range'], observed=True).tail(1)
@@ -2,9 +2,28 @@ import streamlit as st
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import google.generativeai as genai
+import hashlib
+import html
 import json
+import os
+import re
+import time
+import unicodedata
 from datetime import datetime, timedelta
 import pandas as pd
+from aggregates import TrainingTimeline, build_filter_index
+from analytics import current_prs, rep_range_prs, set_metrics, weekly_volume
+from exercise_index import ExerciseIndex
+from coach import COACH_MODEL, coach_summary, stream_coach_advice
+from journal import Journal
+from micro_batcher import MicroBatcher
+from parse_cache import ParseCache
+from pr_tracker import PRTracker
+from report_cache import ReportCache
+from sheet_sync import SheetSync, WorksheetCache
+from sheets_http import RateLimitedHTTPClient
+from storage import SheetsStorage, SQLiteStorage, rows_rejected
+from workout_parser import log_workouts
 
 # --- CONFIGURATION ---
 st.set_page_config(page_title="Gym AI", page_icon="🔥", layout="centered")
@@ -41,67 +60,197 @@ try:
 except:
     pass
 
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+SNAPSHOT_PATH = os.path.join(CACHE_DIR, "exercises.arrow")
+# Per-athlete storage (with its mirror), journals and PR trackers; an athlete pushed out
+# is rebuilt from their files on next use
+ATHLETE_CACHE_ENTRIES = 16
+# Derived tables are cached per (athlete, data version); room for two versions of each athlete
+DERIVED_CACHE_ENTRIES = 2 * ATHLETE_CACHE_ENTRIES
+
+def athlete_id(name):
+    # "Jane Doe " -> "jane-doe", "José" -> "josé"; the empty id is the original single-user
+    # partition, so a non-blank name never gets it: one with no letters or digits is hashed
+    name = unicodedata.normalize("NFKC", name or "").strip()
+    slug = re.sub(r"[\W_]+", "-", name.casefold()).strip("-")
+    if name and not slug:
+        slug = "id-" + hashlib.sha256(name.encode("utf-8")).hexdigest()[:12]
+    return slug
+
+def partition_path(path, user):
+    # Each athlete gets their own copy of a per-user file: journal.jsonl -> journal.jane-doe.jsonl
+    if not user:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{user}{ext}"
+
+def partition_worksheet(user):
+    return f"Exercises - {user}" if user else "Exercises"
+
+def journal_path(user):
+    return partition_path(os.path.join(CACHE_DIR, "journal.jsonl"), user)
+
 @st.cache_resource
 def get_db_connection():
     key_content = st.secrets["gcp_service_account"]["json_key"]
     creds_dict = json.loads(key_content, strict=False)
     scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
     creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-    client = gspread.authorize(creds)
+    # Paced and retrying, since every session shares this service account's quota
+    client = gspread.authorize(creds, http_client=RateLimitedHTTPClient)
     return client
 
-# --- AI PARSER ---
-def parse_workout(text):
-    MODEL_NAME = 'models/gemini-2.5-flash'
+@st.cache_resource
+def get_exercise_index():
+    return ExerciseIndex(os.path.join(CACHE_DIR, "exercise_index.sqlite"))
+
+# Versions are only unique within one athlete's partition, so the user is part of every key
+@st.cache_resource(max_entries=DERIVED_CACHE_ENTRIES)
+def get_filter_index(user, version, _df):
+    # cache_resource, not cache_data: the index is handed out as-is instead of unpickled per rerun
+    return build_filter_index(_df)
+
+@st.cache_resource(max_entries=DERIVED_CACHE_ENTRIES)
+def get_timeline(user, version, _df):
+    return TrainingTimeline(_df)
+
+@st.cache_resource(max_entries=DERIVED_CACHE_ENTRIES)
+def get_set_metrics(user, version, _df):
+    # Tonnage and estimated 1RM for every set, row-aligned with _df so filter positions apply
+    return set_metrics(_df)
+
+@st.cache_resource(max_entries=DERIVED_CACHE_ENTRIES)
+def get_weekly_volume(user, version, _df):
+    return weekly_volume(_df)
+
+@st.cache_resource(max_entries=DERIVED_CACHE_ENTRIES)
+def get_rep_range_prs(user, version, _df):
+    return current_prs(rep_range_prs(_df))
+
+@st.cache_resource
+def get_worksheets():
+    return WorksheetCache(get_db_connection())
+
+@st.cache_resource(max_entries=ATHLETE_CACHE_ENTRIES)
+def get_storage(user=""):
+    # Google Sheets by default; `[storage] backend = "sqlite"` (and optional `path`) in
+    # secrets.toml switches to the local SQLite engine. For Sheets, STATS is served from the
+    # last good copy while it refreshes in the background unless `stale_while_revalidate = false`.
+    # Each athlete is their own partition: a worksheet tab, or a SQLite file, per user.
     try:
-        model = genai.GenerativeModel(MODEL_NAME)
-        prompt = f"""
-        You are a strict Gym Data Manager. Convert this text: "{text}" into JSON.
-        
-        CRITICAL NAMING RULES:
-        1. "exercise": Distinguish Equipment (Barbell/Dumbbell) and Angle (Flat/Incline/Decline).
-        2. "muscle_group": MUST be one of: [Chest, Back, Legs, Shoulders, Biceps, Triceps, Abs, Cardio].
-        
-        EXAMPLES:
-        - "bench" -> "Flat Barbell Bench Press"
-        - "incline db" -> "Incline Dumbbell Press"
-        - "squat" -> "Barbell Back Squat"
-        
-        Output JSON list with keys: exercise, muscle_group, weight, reps, notes.
-        """
-        response = model.generate_content(prompt)
-        cleaned_text = response.text.replace("```json", "").replace("```", "").strip()
-        return json.loads(cleaned_text)
+        settings = dict(st.secrets["storage"])
     except:
-        return None
+        settings = {}
+    if settings.get("backend") == "sqlite":
+        return SQLiteStorage(partition_path(settings.get("path", os.path.join(CACHE_DIR, "workouts.sqlite")), user))
+    # The storage owns its athlete's mirror (and the daily table listening to it), so both are
+    # evicted together; it survives load_data's TTL so each refresh only reads new rows
+    sync = SheetSync(snapshot_path=partition_path(SNAPSHOT_PATH, user),
+                     canonicalize=get_exercise_index().canonical_name)
+    return SheetsStorage(get_worksheets(), sync, worksheet=partition_worksheet(user),
+                         stale_while_revalidate=settings.get("stale_while_revalidate", True),
+                         create_missing=bool(user))
+
+# --- AI PARSER ---
+@st.cache_resource
+def get_parse_cache():
+    return ParseCache(os.path.join(CACHE_DIR, "parse_cache.sqlite"))
 
 # --- AI COACH LOGIC ---
-def get_coach_advice(df):
-    # Prepare a summary of the last 30 days
-    summary = df['Muscle Group'].value_counts().to_string()
-    
-    MODEL_NAME = 'models/gemini-2.5-flash'
+@st.cache_resource
+def get_report_cache():
+    # Same training summary + same model = same report, so repeat clicks cost no quota
+    return ReportCache(os.path.join(CACHE_DIR, "coach_reports.sqlite"))
+
+def coach_card(advice):
+    return f"""
+    <div style="background-color: #1E1E1E; padding: 20px; border-radius: 10px; border-left: 5px solid #E63946;">
+        <h3 style="margin-top:0; color: #E63946;">🛡️ Coach Assessment</h3>
+        <p style="font-size: 1.1em; line-height: 1.5; color: #ddd;">{advice}</p>
+    </div>
+    """
+
+# --- DATA ---
+@st.cache_data(ttl=60, max_entries=ATHLETE_CACHE_ENTRIES)
+def load_data(user=""):
+    # Errors propagate (and so aren't cached); the caller decides what to show instead
+    return get_storage(user).load(on_refresh=lambda: load_data.clear(user))
+
+# --- LOGGING ---
+@st.cache_resource(max_entries=ATHLETE_CACHE_ENTRIES)
+def get_journal(user=""):
+    # Parsed sets hit this local write-ahead journal first; its flusher drains them to the
+    # storage backend with backoff, so a quota error or network blip never loses a set
+    # Rows the backend refuses outright are set aside instead of blocking everything behind them
+    return Journal(journal_path(user), get_storage(user).append_sets,
+                   on_flush=lambda: load_data.clear(user), is_rejected=rows_rejected)
+
+@st.cache_resource(max_entries=ATHLETE_CACHE_ENTRIES)
+def get_pr_tracker(user=""):
+    # Best weight per exercise and rep count, checked as each set is logged. If the history
+    # can't be read to seed it, this raises and nothing is cached, so the next call retries.
+    tracker = PRTracker(partition_path(os.path.join(CACHE_DIR, "prs.sqlite"), user))
+    if tracker.is_empty():
+        tracker.seed(load_data(user))
+    return tracker
+
+def try_pr_tracker(user):
+    # Logging never waits on PRs: without a seeded tracker the sets are saved unchecked
     try:
-        model = genai.GenerativeModel(MODEL_NAME)
-        prompt = f"""
-        I am a bodybuilder. Here is my set volume per muscle group for the last 30 days:
-        {summary}
-        
-        Analyze my training split.
-        1. Identify the Most Neglected muscle group.
-        2. Identify the Most Overworked muscle group.
-        3. Give me 1 specific actionable tip to balance my physique.
-        
-        Keep it short, brutal, and motivating. Max 3 sentences.
-        """
-        response = model.generate_content(prompt)
-        return response.text
+        return get_pr_tracker(user)
     except:
-        return "Coach is on a coffee break. Try again later."
+        return None
+
+@st.cache_resource
+def get_log_batcher():
+    # Shared by every session and athlete: submissions landing within half a second of each
+    # other become one Gemini prompt and one write per athlete's journal. Resources are bound
+    # here (and each entry carries its athlete's) because the handler runs on the batcher's
+    # own thread.
+    parse_cache, exercise_index = get_parse_cache(), get_exercise_index()
+    return MicroBatcher(lambda entries: log_workouts(entries, parse_cache, exercise_index), window=0.5)
+
+def show_pending_card(text):
+    st.markdown(f"""
+    <div style="background-color: #262730; padding: 10px; border-radius: 10px; margin-bottom: 5px; border-left: 5px solid #666;">
+        <span style="font-size: 0.8em; color: #aaa; text-transform: uppercase;">⏳ Processing...</span><br>
+        <span style="color:#ddd;">{html.escape(text)}</span>
+    </div>
+    """, unsafe_allow_html=True)
+
+def pr_badge(item):
+    if 'previous_best' not in item:
+        return ""
+    return f"""<br><span style="font-size: 0.8em; color: #FFD166; font-weight: bold;">🏆 NEW PR! Beat {item['previous_best']:g}kg x {item['reps']}</span>"""
+
+def show_workout_cards(workout_data):
+    with st.container():
+        for item in workout_data:
+            group_color = "#E63946"
+            if item['muscle_group'] == 'Legs': group_color = "#457b9d"
+            if item['muscle_group'] == 'Back': group_color = "#2a9d8f"
+            
+            st.markdown(f"""
+            <div style="background-color: #262730; padding: 10px; border-radius: 10px; margin-bottom: 5px; border-left: 5px solid {group_color};">
+                <span style="font-size: 0.8em; color: {group_color}; text-transform: uppercase;">{item['muscle_group']}</span><br>
+                <strong style="color:white;">{item['exercise']}</strong>
+                <span style="color:#aaa; float:right;">{item['weight']}kg x {item['reps']}</span>{pr_badge(item)}
+            </div>
+            """, unsafe_allow_html=True)
 
 # --- UI HEADER ---
 st.markdown("<h1 style='text-align: center; color: #E63946;'>🔥 XYDEN GYM</h1>", unsafe_allow_html=True)
 
+# --- ATHLETE ---
+# Everyone at the gym shares the app; each athlete only ever loads their own partition.
+# Blank is the original single-user log. ?user=<name> in the URL preselects it.
+athlete = st.text_input("Athlete", value=st.query_params.get("user", ""), placeholder="Your name (blank = shared log)")
+user = athlete_id(athlete)
+if user:
+    st.query_params["user"] = user
+elif "user" in st.query_params:
+    del st.query_params["user"]
+
 # --- TABS ---
 tab1, tab2, tab3 = st.tabs(["📝 LOG", "📈 STATS", "🧠 COACH"])
 
@@ -116,102 +265,141 @@ with tab1:
                                   placeholder="e.g. Incline DB Press 30kg 10 reps...")
         submitted = st.form_submit_button("LOG SESSION")
 
+    parse_cache = get_parse_cache()
+    if parse_cache.hits + parse_cache.misses:
+        st.caption(f"AI parse cache: {parse_cache.hit_rate():.0%} hit rate "
+                   f"({parse_cache.hits}/{parse_cache.hits + parse_cache.misses} lookups)")
+
     if submitted and user_input:
-        with st.spinner("Processing..."):
-            workout_data = parse_workout(user_input)
+        # Hand the entry to the batcher and return straight away; the card below tracks it
+        try:
+            date_only = datetime.now().strftime("%Y-%m-%d")
+            future = get_log_batcher().submit((user_input, date_only, get_journal(user), try_pr_tracker(user)))
+            entries = [e for e in st.session_state.get('log_entries', []) if not e['future'].done()]
+            st.session_state['log_entries'] = entries + [{'text': user_input, 'future': future}]
+            st.session_state['log_polling'] = True
+        except Exception as e:
+            st.error(f"Error: {e}")
+
+    # Polls while anything is in flight, then does one full rerun so STATS picks up the new sets
+    @st.fragment(run_every=1 if st.session_state.get('log_polling') else None)
+    def show_log_entries():
+        entries = st.session_state.get('log_entries', [])
+        for entry in entries:
+            future = entry['future']
+            if not future.done():
+                show_pending_card(entry['text'])
+                continue
+            try:
+                workout_data = future.result()
+            except Exception as e:
+                st.error(f"Error: {e}")
+                continue
             if workout_data:
-                try:
-                    client = get_db_connection()
-                    sh = client.open("My Workout DB")
-                    ex_sheet = sh.worksheet("Exercises")
-                    date_only = datetime.now().strftime("%Y-%m-%d")
-                    
-                    rows = []
-                    for item in workout_data:
-                        rows.append([
-                            date_only, 
-                            item.get('exercise', 'Unknown').title(),
-                            item.get('weight', 0),
-                            item.get('reps', 0),
-                            item.get('notes', ''),
-                            item.get('muscle_group', 'Other')
-                        ])
-                    
-                    ex_sheet.append_rows(rows)
-                    st.cache_data.clear()
-                    
-                    st.success(f"🔥 Added {len(rows)} sets!")
-                    
-                    with st.container():
-                        for item in workout_data:
-                            group_color = "#E63946"
-                            if item['muscle_group'] == 'Legs': group_color = "#457b9d"
-                            if item['muscle_group'] == 'Back': group_color = "#2a9d8f"
-                            
-                            st.markdown(f"""
-                            <div style="background-color: #262730; padding: 10px; border-radius: 10px; margin-bottom: 5px; border-left: 5px solid {group_color};">
-                                <span style="font-size: 0.8em; color: {group_color}; text-transform: uppercase;">{item['muscle_group']}</span><br>
-                                <strong style="color:white;">{item['exercise']}</strong>
-                                <span style="color:#aaa; float:right;">{item['weight']}kg x {item['reps']}</span>
-                            </div>
-                            """, unsafe_allow_html=True)
-
-                except Exception as e:
-                    st.error(f"Error: {e}")
+                st.success(f"🔥 Added {len(workout_data)} sets!")
+                show_workout_cards(workout_data)
             else:
                 st.error("AI Error.")
 
+        # Creating the journal also starts draining anything a previous run left behind; an
+        # athlete who has never logged here has no journal, and browsing doesn't create one
+        try:
+            journal = get_journal(user) if os.path.exists(journal_path(user)) else None
+        except:
+            journal = None
+        unsynced = journal.pending_count if journal else 0
+        if unsynced:
+            retry = f" (retrying: {journal.last_error})" if journal.last_error else ""
+            st.caption(f"⏳ {unsynced} sets saved locally, syncing{retry}")
+        if journal and journal.rejected_count:
+            reason = f": {journal.rejected_error}" if journal.rejected_error else ""
+            st.warning(f"⚠️ {journal.rejected_count} sets were refused by storage and set aside in "
+                       f"{os.path.basename(journal.dead_path)}{reason}")
+
+        all_done = all(e['future'].done() for e in entries)
+        if st.session_state.get('log_polling') and all_done and not unsynced:
+            st.session_state['log_polling'] = False
+            st.rerun()
+
+    show_log_entries()
+
 # ==========================================
 # TAB 2: STATS
 # ==========================================
 with tab2:
     st.markdown("###")
-    @st.cache_data(ttl=60)
-    def load_data():
-        try:
-            client = get_db_connection()
-            sheet = client.open("My Workout DB").worksheet("Exercises")
-            data = sheet.get_all_records()
-            df = pd.DataFrame(data)
-            df['Exercise'] = df['Exercise'].astype(str).str.title().str.strip()
-            if 'Muscle Group' not in df.columns: df['Muscle Group'] = 'Uncategorized'
-            return df
-        except:
-            return pd.DataFrame()
-
-    df = load_data()
+    try:
+        df = load_data(user)
+        stale = get_storage(user).refresh_error()
+    except Exception as e:
+        st.warning(f"Couldn't load your history: {e}")
+        df, stale = pd.DataFrame(), None
+    if stale:
+        error, age = stale
+        since = "the last saved copy" if age == float('inf') else f"{int(age // 60)} min ago"
+        st.caption(f"⚠️ Showing your history as of {since}; refreshing it failed: {error}")
 
     if not df.empty:
+        filters = get_filter_index(user, df.attrs.get('version'), df)
+
         # Muscle Group Filter
-        groups = sorted(df['Muscle Group'].unique().tolist())
+        groups = list(filters)
         selected_group = st.selectbox("Filter by Muscle:", groups)
         
         # Exercise Filter
-        subset = df[df['Muscle Group'] == selected_group]
-        exercises = sorted(subset['Exercise'].unique().tolist())
+        exercises = list(filters.get(selected_group, {}))
         
         if exercises:
             selected_ex = st.selectbox("Select Movement:", exercises)
+            st.caption(f"{len(filters[selected_group][selected_ex])} sets logged")
+            
+            # Chart (read straight from the precomputed exercise x date table)
+            storage = get_storage(user)
+            progress = storage.daily_progress(selected_group, selected_ex)
             
-            # Chart
-            ex_data = subset[subset['Exercise'] == selected_ex].copy()
-            ex_data['Weight'] = pd.to_numeric(ex_data['Weight'], errors='coerce')
-            progress = ex_data.groupby('Date')['Weight'].max().reset_index()
+            version = df.attrs.get('version')
+            sets = get_set_metrics(user, version, df).iloc[filters[selected_group][selected_ex]]
+            chart = progress.set_index('Date')[['Weight']].join(
+                sets.groupby('Date')['Epley 1RM'].max().rename('Est. 1RM'))
             
             st.markdown(f"<h3 style='color:#E63946'>{selected_ex}</h3>", unsafe_allow_html=True)
-            st.line_chart(progress.set_index('Date'), color="#E63946")
+            st.line_chart(chart, color=["#E63946", "#888888"])
             
             # PR Badge
-            max_lift = progress['Weight'].max()
+            max_lift = storage.all_time_best(selected_group, selected_ex)
+            best_1rm = sets['Epley 1RM'].max()
             st.markdown(f"""
             <div style="background-color: #262730; padding: 15px; border-radius: 10px; text-align: center; border: 1px solid #E63946;">
                 <span style="color: #aaa;">ALL TIME BEST</span><br>
-                <span style="font-size: 2em; font-weight: bold; color: white;">{max_lift} <span style="font-size: 0.5em; color: #E63946;">KG</span></span>
+                <span style="font-size: 2em; font-weight: bold; color: white;">{max_lift} <span style="font-size: 0.5em; color: #E63946;">KG</span></span><br>
+                <span style="color: #aaa;">EST. 1RM {best_1rm:.1f} KG</span>
             </div>
             """, unsafe_allow_html=True)
+            
+            # Rep-range PRs
+            prs = get_rep_range_prs(user, version, df)
+            prs = prs[prs['Exercise'] == selected_ex]
+            if not prs.empty:
+                st.caption("Best weight per rep range")
+                st.dataframe(prs[['Rep Range', 'Weight', 'Reps', 'Date']], hide_index=True, width="stretch")
+            
+            # Weekly tonnage for the whole muscle group
+            weekly = get_weekly_volume(user, version, df)
+            group_weeks = weekly[weekly.index.get_level_values('Muscle Group') == selected_group]
+            if not group_weeks.empty:
+                st.caption(f"{selected_group} tonnage per week (KG)")
+                st.bar_chart(group_weeks.droplevel('Muscle Group')['Tonnage'].tail(12), color="#E63946")
         else:
             st.info("No exercises found.")
 
+    # Sheets API usage for this process, shared by every session
+    try:
+        api = get_db_connection().http_client.stats()
+        st.caption(f"Sheets API: {api['requests']} requests · {api['retries']} retries · "
+                   f"{api['throttled_seconds']:.1f}s throttled")
+    except:
+        pass
+
 # ==========================================
 # TAB 3: AI COACH (WEAKNESS DETECTOR)
 # ==========================================
@@ -220,25 +408,49 @@ with tab3:
     st.header("⚖️ Physique Balance")
     
     if not df.empty:
+        timeline = get_timeline(user, df.attrs.get('version'), df)
+
         # 1. VISUAL SPLIT (Bar Chart)
-        st.caption("Sets per Muscle Group (All Time)")
-        split_counts = df['Muscle Group'].value_counts()
-        st.bar_chart(split_counts, color="#E63946")
+        windows = {"7 Days": 7, "30 Days": 30, "90 Days": 90, "All Time": None}
+        span = st.radio("Window", list(windows), index=1, horizontal=True, label_visibility="collapsed")
+        st.caption(f"Sets per Muscle Group ({'All Time' if windows[span] is None else 'Last ' + span})")
+        split_counts = timeline.group_counts(windows[span])
+        if split_counts.empty:
+            st.info("No sets logged in this window.")
+        else:
+            st.bar_chart(split_counts, color="#E63946")
         
         # 2. AI AUDIT BUTTON
         st.write("---")
         st.caption("Ask the AI where you are lacking:")
         
-        if st.button("GENERATE REPORT"):
-            with st.spinner("Analyzing your weak points..."):
-                advice = get_coach_advice(df)
-                
-                # Show advice in a nice card
-                st.markdown(f"""
-                <div style="background-color: #1E1E1E; padding: 20px; border-radius: 10px; border-left: 5px solid #E63946;">
-                    <h3 style="margin-top:0; color: #E63946;">🛡️ Coach Assessment</h3>
-                    <p style="font-size: 1.1em; line-height: 1.5; color: #ddd;">{advice}</p>
-                </div>
-                """, unsafe_allow_html=True)
+        col_generate, col_regenerate = st.columns([3, 1])
+        generate = col_generate.button("GENERATE REPORT")
+        regenerate = col_regenerate.button("🔄 REGENERATE", help="Ask the coach again instead of reusing the last report")
+        if (generate or regenerate) and timeline.group_counts(30).empty:
+            st.info("No sets in the last 30 days for the Coach to look at.")
+        elif generate or regenerate:
+            report_cache = get_report_cache()
+            summary = coach_summary(timeline)
+            cached = None if regenerate else report_cache.get(summary, COACH_MODEL, user)
+            if cached:
+                advice, created = cached
+                st.markdown(coach_card(advice), unsafe_allow_html=True)
+                st.caption(f"♻️ Saved report from {int((time.time() - created) // 60)} min ago. Your split hasn't changed since")
+            else:
+                # Render tokens into the card as they arrive; time-to-first-token is what the
+                # user feels, the total is what the old blocking call used to cost
+                card = st.empty()
+                card.markdown(coach_card("Analyzing your weak points..."), unsafe_allow_html=True)
+                advice, ttft = "", None
+                started = time.perf_counter()
+                for chunk in stream_coach_advice(summary, report_cache, user):
+                    if ttft is None: ttft = time.perf_counter() - started
+                    advice += chunk
+                    card.markdown(coach_card(advice + " ▌"), unsafe_allow_html=True)
+                total = time.perf_counter() - started
+                card.markdown(coach_card(advice), unsafe_allow_html=True)
+                if ttft is not None:
+                    st.caption(f"⏱️ First words in {ttft:.2f}s · full report in {total:.2f}s")
     else:
         st.info("Log more workouts to unlock the Coach.")
\ No newline at end of file
@@ -0,0 +1,332 @@
+"""Times the LOG, STATS and COACH paths against local fakes of Google Sheets and Gemini.
+
+    python bench.py                                   # 1k .. 1M sets, JSON on stdout
+    python bench.py --sizes 1000,100000 --model-latency 0.3 --quota-error-rate 0.1 -o bench.json
+
+Everything runs in-process on the same modules the app uses; only the gspread
+worksheet and the Gemini model are fakes. Results are one JSON document with a
+record per (benchmark, history size), so two runs can be diffed to spot regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import google.generativeai as genai
+import pandas as pd
+from google.api_core.exceptions import ResourceExhausted
+
+from aggregates import TrainingTimeline, build_filter_index
+from analytics import rep_range_prs, set_metrics, weekly_volume
+from coach import coach_summary, get_coach_advice, stream_coach_advice
+from exercise_index import ExerciseIndex
+from fast_parser import EXERCISES
+from journal import Journal
+from parse_cache import ParseCache
+from pr_tracker import PRTracker
+from report_cache import ReportCache
+from sheet_sync import SheetSync, WorksheetCache
+from storage import HEADER, SheetsStorage
+from workout_parser import log_workouts, parse_workout, parse_workouts
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+SETS_PER_DAY = 15
+MOVEMENTS = [(name, group) for name, (group, _) in EXERCISES.items()]
+
+# Entries the regex fast path handles, and free text that has to go to the model
+FAST_ENTRIES = ["bench 80kg 5 reps", "squat 100kg x 5", "deadlift 140 kg x 3, bench 80kg x 8",
+                "cable crossover 20kg 12 reps"]
+MODEL_ENTRIES = ["superset curls and dips till failure", "did 3 sets of incline db 30s for 10",
+                 "bodyweight pullups 4 sets each to failure", "drop set lateral raises 10 8 6 per side"]
+
+
+# --- FAKES ---
+def synthetic_row(i, first_day):
+    # Deterministic set number i: SETS_PER_DAY sets a day, ending today
+    name, group = MOVEMENTS[(i * 7) % len(MOVEMENTS)]
+    day = first_day + timedelta(days=i // SETS_PER_DAY)
+    return [day.isoformat(), name, str(20 + (i * 37) % 120), str(1 + (i * 13) % 15), "", group]
+
+
+class FakeWorksheet:
+    """Just enough of gspread.Worksheet for SheetSync: row-range reads and appends.
+
+    The first `rows` data rows are generated on demand, so a million-set history costs
+    no memory until it is read.
+    """
+
+    def __init__(self, rows, title="Exercises", latency=0.0):
+        self.title = title
+        self.generated = rows
+        self.first_day = date.today() - timedelta(days=max(rows - 1, 0) // SETS_PER_DAY)
+        self.appended = []
+        self.latency = latency
+        self.calls = 0
+
+    @property
+    def row_count(self):
+        # gspread's grid size; this sheet's grid ends at its last row
+        return 1 + self.generated + len(self.appended)
+
+    def get(self, rng, **kwargs):
+        self._call()
+        first, last = (int(n) for n in rng.split(":"))
+        rows = []
+        for row in range(first, min(last, self.row_count) + 1):
+            if row == 1:
+                rows.append(list(HEADER))
+            elif row - 2 < self.generated:
+                rows.append(synthetic_row(row - 2, self.first_day))
+            else:
+                rows.append(self.appended[row - 2 - self.generated])
+        # Like gspread, a range past the last row comes back as one empty row, not none
+        return rows or [[]]
+
+    def append_rows(self, rows, **kwargs):
+        self._call()
+        start = self.row_count + 1
+        self.appended.extend([str(c) for c in row] for row in rows)
+        return {"updates": {"updatedRange": f"{self.title}!A{start}:F{self.row_count}",
+                            "updatedRows": len(rows)}}
+
+    def append_row(self, row, **kwargs):
+        self.append_rows([row])
+
+    def _call(self):
+        self.calls += 1
+        if self.latency: time.sleep(self.latency)
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheet, title="My Workout DB"):
+        self.id = "bench"
+        self.title = title
+        self.sheets = {worksheet.title: worksheet}
+
+    def worksheet(self, title):
+        return self.sheets[title]
+
+
+class FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open(self, title):
+        return self.spreadsheet
+
+    def open_by_key(self, key):
+        return self.spreadsheet
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel: sleeps `latency` per call and fails
+    `error_rate` of them with the 429 Gemini returns when the quota runs out."""
+
+    latency = 0.0
+    error_rate = 0.0
+    rng = random.Random(0)
+    calls = 0
+
+    def __init__(self, model_name, **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        FakeModel.calls += 1
+        time.sleep(self.latency)
+        if self.rng.random() < self.error_rate:
+            raise ResourceExhausted("429 Resource has been exhausted (e.g. check quota).")
+        if "bodybuilder" in prompt:
+            chunks = ["Legs are lagging. ", "Chest is overcooked. ", "Swap one press day for squats."]
+            return self._stream(chunks) if stream else FakeResponse("".join(chunks))
+        item = {"exercise": "Lateral Raise", "muscle_group": "Shoulders", "weight": 10, "reps": 10, "notes": ""}
+        batch = re.search(r"Convert each of these (\d+) numbered", prompt)
+        if batch:
+            return FakeResponse("```json\n" + json.dumps([[item]] * int(batch.group(1))) + "\n```")
+        return FakeResponse("```json\n" + json.dumps([item]) + "\n```")
+
+    def _stream(self, chunks):
+        for n, chunk in enumerate(chunks):
+            if n: time.sleep(self.latency / 4)
+            yield FakeResponse(chunk)
+
+
+# --- HARNESS ---
+def measure(fn, repeat, setup=None):
+    # -> per-run seconds; setup() runs untimed before each run and its result is passed to fn
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        fn(arg) if setup else fn()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def record(results, name, sets, times, **extra):
+    results.append({"name": name, "sets": sets, "runs": len(times),
+                    "min_s": min(times), "median_s": statistics.median(times), "max_s": max(times), **extra})
+    print(f"{name:<28} {sets or '':>9} {statistics.median(times) * 1000:10.2f} ms", file=sys.stderr)
+
+
+def sheets_storage(rows, workdir, exercise_index, sheet_latency, snapshot=False):
+    # Configured as the app's get_storage() does. Without `snapshot` nothing is cached
+    # locally, so load() has to read the whole sheet.
+    worksheet = FakeWorksheet(rows, latency=sheet_latency)
+    snapshot_path = os.path.join(workdir, f"snapshot-{rows}.arrow")
+    if not snapshot and os.path.exists(snapshot_path):
+        os.remove(snapshot_path)
+    sync = SheetSync(snapshot_path=snapshot_path, canonicalize=exercise_index.canonical_name)
+    storage = SheetsStorage(WorksheetCache(FakeClient(FakeSpreadsheet(worksheet))), sync,
+                            stale_while_revalidate=True)
+    return storage, worksheet
+
+
+def settled(storage, timeout=60.0):
+    # Wait out the background revalidation a cold start kicks off, so it can't overlap the next timing
+    deadline = time.monotonic() + timeout
+    while storage.sync.last_synced is None and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def bench_parse(results, workdir, exercise_index, repeat):
+    def run(name, parse, entries):
+        # model_calls and failed (entries left unparsed, e.g. by a 429) are per run
+        calls, failed = FakeModel.calls, []
+        times = measure(lambda: failed.append(sum(r is None for r in parse(entries))), repeat)
+        record(results, name, None, times, entries=len(entries),
+               model_calls=(FakeModel.calls - calls) // repeat, failed=max(failed))
+
+    one_by_one = lambda cache: lambda entries: [parse_workout(t, cache, exercise_index) for t in entries]
+    run("parse_workout.fast", one_by_one(None), FAST_ENTRIES)
+    run("parse_workout.model", one_by_one(None), MODEL_ENTRIES)
+    run("parse_workouts.batched", lambda entries: parse_workouts(entries, None, exercise_index), MODEL_ENTRIES)
+    cache = ParseCache(os.path.join(workdir, "parse_cache.sqlite"))
+    parse_workouts(MODEL_ENTRIES, cache, exercise_index)
+    run("parse_workout.cached", one_by_one(cache), MODEL_ENTRIES)
+
+
+def bench_history(results, rows, workdir, exercise_index, repeat, sheet_latency):
+    # load_data: full pull, a warm load, a tail pull with nothing new, and a cold start from the
+    # local snapshot, all through the app's storage (stale-while-revalidate, daily table attached)
+    fresh = lambda: sheets_storage(rows, workdir, exercise_index, sheet_latency)
+    record(results, "load_data.cold", rows, measure(lambda s: s[0].load(), repeat, setup=fresh))
+    storage, worksheet = fresh()
+    df = storage.load()
+    calls = worksheet.calls
+    record(results, "load_data.warm", rows, measure(storage.load, repeat),
+           sheet_calls=(worksheet.calls - calls) // repeat)
+    calls = worksheet.calls
+    record(results, "load_data.tail", rows, measure(lambda: storage.sync.sync(worksheet), repeat),
+           sheet_calls=(worksheet.calls - calls) // repeat)
+    if len(storage.sync.df) != rows:
+        # An empty tail read must not turn into sets; timings over a wrong frame mean nothing
+        raise RuntimeError(f"mirror holds {len(storage.sync.df)} sets after idle syncs, expected {rows}")
+    restarted = []
+    def restart():
+        if restarted: settled(restarted[-1])
+        restarted.append(sheets_storage(rows, workdir, exercise_index, sheet_latency, snapshot=True)[0])
+        return restarted[-1]
+    record(results, "load_data.snapshot", rows, measure(lambda s: s.load(), repeat, setup=restart))
+    settled(restarted[-1])
+
+    # STATS: everything the tab derives from a new data version, then one movement's chart
+    group, exercise = df['Muscle Group'].iloc[0], df['Exercise'].iloc[0]
+    record(results, "stats.filter_index", rows, measure(lambda: build_filter_index(df), repeat))
+    # The reload itself only swaps the frame in; the grouping happens on the first chart read
+    def rebuild():
+        storage.daily.reset(df)
+        storage.daily_progress(group, exercise)
+    record(results, "stats.daily_aggregates", rows, measure(rebuild, repeat))
+    record(results, "stats.daily_progress", rows, measure(lambda: storage.daily_progress(group, exercise), repeat))
+    record(results, "stats.set_metrics", rows, measure(lambda: set_metrics(df), repeat))
+    record(results, "stats.weekly_volume", rows, measure(lambda: weekly_volume(df), repeat))
+    record(results, "stats.rep_range_prs", rows, measure(lambda: rep_range_prs(df), repeat))
+    record(results, "stats.timeline", rows, measure(lambda: TrainingTimeline(df), repeat))
+    timeline = TrainingTimeline(df)
+
+    # COACH: the 30-day summary, a generated report (with time to first chunk), and a cached one
+    record(results, "coach.summary", rows, measure(lambda: coach_summary(timeline), repeat))
+    summary = coach_summary(timeline)
+    ttft = []
+    def generate():
+        started = time.perf_counter()
+        for _ in stream_coach_advice(summary):
+            ttft.append(time.perf_counter() - started)
+            break
+    record(results, "coach.generate", rows, measure(generate, repeat), ttft_median_s=statistics.median(ttft))
+    record(results, "get_coach_advice", rows, measure(lambda: get_coach_advice(summary), repeat))
+    reports = ReportCache(os.path.join(workdir, "coach_reports.sqlite"))
+    get_coach_advice(summary, reports)
+    calls = FakeModel.calls
+    record(results, "get_coach_advice.cached", rows, measure(lambda: get_coach_advice(summary, reports), repeat),
+           model_calls=(FakeModel.calls - calls) // repeat)
+
+    # LOG: parse + journal fsync (what the user waits for), then the drain into the sheet
+    journal = Journal(os.path.join(workdir, f"journal-{rows}.jsonl"), storage.append_sets)
+    prs = PRTracker(os.path.join(workdir, f"prs-{rows}.sqlite"))
+    prs.seed(df)
+    today = datetime.now().strftime("%Y-%m-%d")
+    entries = [(text, today, journal, prs) for text in FAST_ENTRIES + MODEL_ENTRIES]
+    drained = []
+    def log():
+        log_workouts(entries, None, exercise_index)
+        started = time.perf_counter()
+        while journal.pending_count:
+            time.sleep(0.001)
+        drained.append(time.perf_counter() - started)
+    record(results, "log.append", rows, measure(log, repeat), entries=len(entries),
+           sheet_drain_median_s=statistics.median(drained))
+    if journal.last_error:
+        print(f"journal error: {journal.last_error}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the log, stats and coach paths against local fakes.")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated history sizes (sets)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="seconds per fake Gemini call")
+    parser.add_argument("--quota-error-rate", type=float, default=0.0, help="fraction of Gemini calls that 429")
+    parser.add_argument("--sheet-latency", type=float, default=0.0, help="seconds per fake Sheets call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    genai.GenerativeModel = FakeModel
+    FakeModel.latency, FakeModel.error_rate = args.model_latency, args.quota_error_rate
+    FakeModel.rng = random.Random(args.seed)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        exercise_index = ExerciseIndex(os.path.join(workdir, "exercise_index.sqlite"))
+        bench_parse(results, workdir, exercise_index, args.repeat)
+        for rows in (int(n) for n in args.sizes.split(",")):
+            bench_history(results, rows, workdir, exercise_index, args.repeat, args.sheet_latency)
+
+    report = {
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "pandas": pd.__version__, "platform": platform.platform(),
+                 "args": {k: v for k, v in vars(args).items() if k != "output"}},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
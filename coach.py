@@ -0,0 +1,49 @@
+import google.generativeai as genai
+
+
+COACH_MODEL = 'models/gemini-2.5-flash'
+
+
+def coach_summary(timeline):
+    # Prepare a summary of the last 30 days
+    return timeline.group_counts(30).to_string()
+
+
+def coach_prompt(summary):
+    return f"""
+        I am a bodybuilder. Here is my set volume per muscle group for the last 30 days:
+        {summary}
+        
+        Analyze my training split.
+        1. Identify the Most Neglected muscle group.
+        2. Identify the Most Overworked muscle group.
+        3. Give me 1 specific actionable tip to balance my physique.
+        
+        Keep it short, brutal, and motivating. Max 3 sentences.
+        """
+
+
+def stream_coach_advice(summary, cache=None, user=""):
+    # Yields the report chunk by chunk as Gemini writes it; only a complete report is cached
+    started = False
+    try:
+        model = genai.GenerativeModel(COACH_MODEL)
+        chunks = []
+        for chunk in model.generate_content(coach_prompt(summary), stream=True):
+            if chunk.text:
+                started = True
+                chunks.append(chunk.text)
+                yield chunk.text
+        if cache is not None and chunks:
+            cache.put(summary, COACH_MODEL, "".join(chunks), user)
+    except:
+        if not started:
+            yield "Coach is on a coffee break. Try again later."
+
+
+def get_coach_advice(summary, cache=None, user=""):
+    # Blocking form: a fresh cached report if there is one, otherwise the whole generated report
+    cached = cache.get(summary, COACH_MODEL, user) if cache is not None else None
+    if cached:
+        return cached[0]
+    return "".join(stream_coach_advice(summary, cache, user))
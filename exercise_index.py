@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import threading
+from collections import Counter
+
+from fast_parser import EXERCISES, normalize_phrase
+
+# Words that make two movements different exercises however similar the rest of the
+# name is ("Incline Dumbbell Press" vs "Decline Dumbbell Press"); fuzzy matches must agree on them.
+QUALIFIERS = {
+    "flat", "incline", "decline", "barbell", "dumbbell", "cable", "machine", "smith", "kettlebell",
+    "front", "back", "rear", "side", "seated", "standing", "lying", "hanging", "single", "one",
+    "close", "wide", "reverse", "hammer", "preacher", "romanian", "sumo", "overhead", "bulgarian",
+}
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ExerciseIndex:
+    """Alias -> (canonical exercise, muscle group), with a trigram index for near-miss spellings.
+
+    Seeded with the built-in names from fast_parser; every new spelling it resolves (from the
+    sheet or from the model) is remembered in SQLite, so the next lookup is an exact dict hit.
+    """
+
+    def __init__(self, path, threshold=0.7):
+        self.threshold = threshold
+        self.aliases = {}
+        self.grams = {}  # trigram -> alias keys containing it
+        self.lock = threading.Lock()
+        for canonical, (group, aliases) in EXERCISES.items():
+            for alias in [canonical] + aliases:
+                self._add(normalize_phrase(alias), canonical, group)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS aliases (alias TEXT PRIMARY KEY, canonical TEXT, muscle_group TEXT)")
+        for alias, canonical, group in self.db.execute("SELECT alias, canonical, muscle_group FROM aliases"):
+            self._add(alias, canonical, group)
+
+    def lookup(self, name):
+        return self.aliases.get(normalize_phrase(name))
+
+    def resolve(self, name, muscle_group=None):
+        """Canonical (exercise, muscle group) for any spelling, registering it if it's new."""
+        key = normalize_phrase(name)
+        if not key:
+            return " ".join(str(name).split()).title(), muscle_group
+        with self.lock:
+            match = self.aliases.get(key) or self._fuzzy(key)
+            if match is None:
+                match = (" ".join(str(name).split()).title(), muscle_group)
+            canonical, group = match
+            if group is None and muscle_group is not None:
+                group = muscle_group
+            if self.aliases.get(key) != (canonical, group):
+                self._add(key, canonical, group)
+                with self.db:
+                    self.db.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?, ?)", (key, canonical, group))
+            return canonical, group
+
+    def canonical_name(self, name):
+        return self.resolve(name)[0]
+
+    def _fuzzy(self, key):
+        query = trigrams(key)
+        overlap = Counter()
+        for gram in query:
+            for alias in self.grams.get(gram, ()):
+                overlap[alias] += 1
+        qualifiers = QUALIFIERS.intersection(key.split())
+        best, best_score = None, self.threshold
+        for alias, shared in overlap.items():
+            score = shared / (len(query) + len(trigrams(alias)) - shared)
+            if score >= best_score and QUALIFIERS.intersection(alias.split()) == qualifiers:
+                best, best_score = alias, score
+        return self.aliases[best] if best else None
+
+    def _add(self, key, canonical, group):
+        self.aliases[key] = (canonical, group)
+        for gram in trigrams(key):
+            self.grams.setdefault(gram, set()).add(key)
@@ -0,0 +1,146 @@
+import re
+
+from sheet_sync import to_number
+
+# Same naming rules the Gemini prompt enforces, so both paths log identical rows.
+MUSCLE_GROUPS = ["Chest", "Back", "Legs", "Shoulders", "Biceps", "Triceps", "Abs", "Cardio"]
+
+# canonical name -> (muscle group, aliases). Aliases go through normalize_phrase(),
+# so "db"/"bb" abbreviations and plurals don't need listing separately.
+EXERCISES = {
+    "Flat Barbell Bench Press": ("Chest", ["bench", "bench press", "flat bench", "barbell bench", "flat barbell bench", "flat bench press"]),
+    "Incline Barbell Bench Press": ("Chest", ["incline bench", "incline bench press", "incline barbell", "incline barbell bench"]),
+    "Decline Barbell Bench Press": ("Chest", ["decline bench", "decline bench press", "decline barbell"]),
+    "Flat Dumbbell Press": ("Chest", ["db bench", "dumbbell bench", "flat db", "flat db press", "dumbbell press", "db press", "flat dumbbell bench"]),
+    "Incline Dumbbell Press": ("Chest", ["incline db", "incline db press", "incline dumbbell", "incline db bench"]),
+    "Decline Dumbbell Press": ("Chest", ["decline db", "decline db press", "decline dumbbell"]),
+    "Dumbbell Fly": ("Chest", ["db fly", "flat db fly", "dumbbell flyes"]),
+    "Cable Fly": ("Chest", ["cable flyes", "cable crossover", "pec fly", "pec deck"]),
+    "Barbell Deadlift": ("Back", ["deadlift", "dl", "conventional deadlift"]),
+    "Barbell Row": ("Back", ["bb row", "bent over row", "barbell bent over row"]),
+    "Dumbbell Row": ("Back", ["db row", "one arm db row", "single arm db row"]),
+    "Lat Pulldown": ("Back", ["pulldown", "lat pull down", "pull down"]),
+    "Seated Cable Row": ("Back", ["cable row", "seated row"]),
+    "Pull Up": ("Back", ["pullup", "pull ups", "chin up", "chinup"]),
+    "Barbell Back Squat": ("Legs", ["squat", "back squat", "bb squat", "barbell squat"]),
+    "Barbell Front Squat": ("Legs", ["front squat"]),
+    "Leg Press": ("Legs", []),
+    "Romanian Deadlift": ("Legs", ["rdl", "romanian dl"]),
+    "Leg Extension": ("Legs", ["leg ext", "quad extension"]),
+    "Leg Curl": ("Legs", ["hamstring curl", "lying leg curl", "seated leg curl"]),
+    "Bulgarian Split Squat": ("Legs", ["bss", "split squat", "bulgarian"]),
+    "Calf Raise": ("Legs", ["calves", "standing calf raise"]),
+    "Barbell Overhead Press": ("Shoulders", ["ohp", "overhead press", "military press", "shoulder press"]),
+    "Dumbbell Shoulder Press": ("Shoulders", ["db shoulder press", "seated db press", "db ohp"]),
+    "Lateral Raise": ("Shoulders", ["lat raise", "side raise", "db lateral raise", "lateral"]),
+    "Rear Delt Fly": ("Shoulders", ["rear delt", "reverse fly"]),
+    "Face Pull": ("Shoulders", []),
+    "Barbell Curl": ("Biceps", ["bb curl", "curl", "bicep curl"]),
+    "Dumbbell Curl": ("Biceps", ["db curl", "db bicep curl"]),
+    "Hammer Curl": ("Biceps", ["hammer", "db hammer curl"]),
+    "Preacher Curl": ("Biceps", ["preacher"]),
+    "Tricep Pushdown": ("Triceps", ["pushdown", "cable pushdown", "rope pushdown", "tricep pushdown"]),
+    "Skull Crusher": ("Triceps", ["skullcrusher", "skull crushers"]),
+    "Overhead Tricep Extension": ("Triceps", ["overhead extension", "tricep extension"]),
+    "Close Grip Bench Press": ("Triceps", ["close grip bench", "cgbp"]),
+    "Cable Crunch": ("Abs", []),
+    "Hanging Leg Raise": ("Abs", ["leg raise", "hanging leg raises"]),
+}
+
+ABBREVIATIONS = {"db": "dumbbell", "dumbell": "dumbbell", "bb": "barbell", "flyes": "fly", "flies": "fly"}
+
+NUM = r"(\d+(?:\.\d+)?)"
+KG = r"(?:kg|kgs|kilo|kilos)"
+# "80kg x 5", "80 kg × 5 reps". Without the unit, "5x5" is sets x reps, so that goes to the model.
+WEIGHT_X_REPS = re.compile(rf"\b{NUM}\s*{KG}\s*[x×*]\s*(\d+)(?:\s*reps?)?\b")
+UNITLESS_X = re.compile(rf"\b{NUM}\s*[x×*]\s*\d+")
+WEIGHT = re.compile(rf"\b{NUM}\s*{KG}\b")
+REPS = re.compile(r"\b(\d+)\s*(?:reps?)\b")
+BARE_NUMBER = re.compile(NUM)
+# Anything that changes the meaning of a line (sets, other units, bodyweight) goes to the model.
+ESCALATE = re.compile(r"\b(?:sets?|lbs?|pounds?|bw|bodyweight|each|per|drop|superset|\d+\s*(?:s|sec|min|km|m))\b")
+SEPARATORS = re.compile(r"[\n;,]+|\s+(?:and|then)\s+")
+
+
+def normalize_phrase(phrase):
+    words = re.sub(r"[^a-z ]+", " ", phrase.lower()).split()
+    out = []
+    for w in words:
+        w = ABBREVIATIONS.get(w, w)
+        if len(w) > 3 and w.endswith("s") and not w.endswith("ss"):
+            w = w[:-1]
+        out.append(w)
+    return " ".join(out)
+
+
+def _build_alias_index():
+    index = {}
+    for canonical, (group, aliases) in EXERCISES.items():
+        for alias in [canonical] + aliases:
+            index[normalize_phrase(alias)] = (canonical, group)
+    return index
+
+ALIAS_INDEX = _build_alias_index()
+
+
+def _weight(s):
+    # 80 rather than 80.0, as the model writes it
+    n = to_number(s)
+    return int(n) if n.is_integer() else n
+
+
+def _parse_entry(entry, lookup):
+    if ESCALATE.search(entry):
+        return None
+    weight = reps = None
+    m = WEIGHT_X_REPS.search(entry)
+    if m:
+        weight, reps = m.group(1), m.group(2)
+        entry = entry[:m.start()] + " " + entry[m.end():]
+    elif UNITLESS_X.search(entry):
+        return None
+    else:
+        m = WEIGHT.search(entry)
+        if m:
+            weight = m.group(1)
+            entry = entry[:m.start()] + " " + entry[m.end():]
+        m = REPS.search(entry)
+        if m:
+            reps = m.group(1)
+            entry = entry[:m.start()] + " " + entry[m.end():]
+        # Unlabelled numbers follow the usual "exercise weight reps" order
+        bare = BARE_NUMBER.findall(entry)
+        entry = BARE_NUMBER.sub(" ", entry)
+        if weight is None and bare: weight = bare.pop(0)
+        if reps is None and bare: reps = bare.pop(0)
+        if bare:
+            return None
+    if weight is None or reps is None or "." in reps or int(reps) == 0:
+        return None
+
+    phrase = normalize_phrase(entry)
+    match = ALIAS_INDEX.get(phrase) or (lookup(phrase) if lookup else None)
+    if match is None or match[1] not in MUSCLE_GROUPS:
+        return None
+    exercise, muscle_group = match
+    return {"exercise": exercise, "muscle_group": muscle_group,
+            "weight": _weight(weight), "reps": int(reps), "notes": ""}
+
+
+def fast_parse(text, lookup=None):
+    """Parse regular entries like "bench 80kg 5 reps" locally.
+
+    Returns the same list of dicts the Gemini parser produces, or None if any part of
+    the text is ambiguous and should be escalated to the model. `lookup` can supply
+    extra exact aliases (name -> (canonical, muscle group)) beyond the built-in table.
+    """
+    entries = [e.strip() for e in SEPARATORS.split(text.lower()) if e and e.strip()]
+    if not entries:
+        return None
+    parsed = []
+    for entry in entries:
+        item = _parse_entry(entry, lookup)
+        if item is None:
+            return None
+        parsed.append(item)
+    return parsed
@@ -0,0 +1,166 @@
+import json
+import os
+import random
+import threading
+import time
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+
+def _locks_for(path):
+    # -> (file lock, flush lock) shared by every Journal on this file, so an instance dropped
+    # from a cache and its replacement never append over a drain or deliver rows twice
+    with _path_locks_guard:
+        return _path_locks.setdefault(os.path.abspath(path), (threading.RLock(), threading.Lock()))
+
+
+class Journal:
+    """Durable append-only log of parsed sets, drained to storage by a background flusher.
+
+    append() fsyncs the rows to disk before returning, so a logged set survives quota errors,
+    network blips and restarts. The flusher hands everything pending to `sink` in one call,
+    retrying with exponential backoff, and only advances the committed offset once the sink
+    accepted it. Delivery is at-least-once: a crash between a successful sink call and the
+    offset write replays that batch on the next start. The flusher thread only runs while
+    rows are pending, so an idle journal costs nothing.
+
+    A batch the sink refuses for good (`is_rejected(error)` is true) is not retried: it moves to
+    a dead-letter file next to the journal, so one bad set can't hold up every later one.
+    """
+
+    def __init__(self, path, sink, on_flush=None, base_delay=1.0, max_delay=300.0, is_rejected=None):
+        self.path = path
+        self.offset_path = path + ".offset"
+        self.dead_path = path + ".rejected"
+        self.sink = sink
+        self.on_flush = on_flush
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.is_rejected = is_rejected
+        self.last_error = None
+        self.rejected_error = None  # why the most recent batch was set aside
+        file_lock, self.flushing = _locks_for(path)
+        self.cond = threading.Condition(file_lock)
+        self.running = False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.cond:
+            self._recover()
+            self.pending_count = len(self._read_pending()[0])
+            self.rejected_count = self._count_rejected()
+            self._start()
+
+    def append(self, rows):
+        line = (json.dumps(rows) + "\n").encode("utf-8")
+        with self.cond:
+            with open(self.path, "ab") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.pending_count += len(rows)
+            self._start()
+
+    def _start(self):
+        # Called under self.cond
+        if self.pending_count and not self.running:
+            self.running = True
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        delay = self.base_delay
+        while True:
+            with self.flushing:
+                with self.cond:
+                    rows, end = self._read_pending()
+                    if not rows:
+                        # Also corrects a count that another instance on this file drained
+                        self.pending_count, self.running = 0, False
+                        return
+                try:
+                    self.sink(rows)
+                    failed = False
+                except Exception as e:
+                    if self.is_rejected and self.is_rejected(e):
+                        with self.cond:
+                            self._set_aside(rows, end)
+                            self.rejected_error = e
+                        continue
+                    self.last_error, failed = e, True
+                else:
+                    with self.cond:
+                        self._commit(end)
+                        self.pending_count = max(self.pending_count - len(rows), 0)
+            if failed:
+                time.sleep(delay * random.uniform(1.0, 1.5))
+                delay = min(delay * 2, self.max_delay)
+                continue
+            delay = self.base_delay
+            self.last_error = None
+            if self.on_flush: self.on_flush()
+
+    def _set_aside(self, rows, end):
+        # Called under self.cond: the batch is durable in the dead-letter file before the offset moves
+        with open(self.dead_path, "ab") as f:
+            f.write((json.dumps(rows) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        self._commit(end)
+        self.pending_count = max(self.pending_count - len(rows), 0)
+        self.rejected_count += len(rows)
+
+    def _count_rejected(self):
+        try:
+            with open(self.dead_path, "rb") as f:
+                return sum(len(json.loads(line)) for line in f if line.strip())
+        except FileNotFoundError:
+            return 0
+
+    def _read_pending(self):
+        # -> (rows after the committed offset, byte offset just past them)
+        offset = self._offset()
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], offset
+        rows = []
+        for line in data.splitlines():
+            if line: rows.extend(json.loads(line))
+        return rows, offset + len(data)
+
+    def _commit(self, end):
+        if end >= os.path.getsize(self.path):
+            # Fully drained: start both files over instead of letting the journal grow forever
+            open(self.path, "wb").close()
+            end = 0
+        self._write_offset(end)
+
+    def _write_offset(self, end):
+        tmp_path = self.offset_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(end))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.offset_path)
+
+    def _offset(self):
+        try:
+            with open(self.offset_path) as f:
+                return int(f.read() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _recover(self):
+        try:
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                # A crash mid-append can leave half a line; cut it so later appends start clean
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            open(self.path, "wb").close()
+        # A crash between emptying the drained journal and resetting the offset leaves the
+        # offset past the end of the file
+        if self._offset() > os.path.getsize(self.path):
+            self._write_offset(0)
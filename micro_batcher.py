@@ -0,0 +1,48 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Coalesces items submitted within `window` seconds into one `handler(items)` call.
+
+    The handler returns one result per item, in order; each submitter gets a Future for
+    its own result. Items that arrive while a batch is being handled queue up for the next.
+    """
+
+    def __init__(self, handler, window=0.5, max_batch=25):
+        self.handler = handler
+        self.window = window
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, item):
+        future = Future()
+        self.queue.put((item, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                results = self.handler(items)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            for future, result in zip(futures, results):
+                future.set_result(result)
@@ -0,0 +1,71 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+UNITS = [
+    (re.compile(r"(\d)\s*(?:kgs|kilos?|kg)\b"), r"\1kg"),
+    (re.compile(r"(\d)\s*(?:repetitions|reps?)\b"), r"\1 reps"),
+    (re.compile(r"(\d)\s*[x×*]\s*(\d)"), r"\1x\2"),
+]
+
+
+def normalize_text(text):
+    # "Bench  80 KG x 5" and "bench 80kg x5" are the same entry
+    key = " ".join(text.lower().split())
+    for pattern, repl in UNITS:
+        key = pattern.sub(repl, key)
+    return key
+
+
+class ParseCache:
+    """Normalized workout text -> parsed sets, LRU-bounded in memory and persisted to SQLite.
+
+    Recency is only written to disk when an entry is stored, so after a restart the
+    eviction order is approximate; lookups themselves never touch the database.
+    """
+
+    def __init__(self, path, max_entries=5000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS parse_cache (key TEXT PRIMARY KEY, value TEXT, last_used REAL)")
+        rows = self.db.execute("SELECT key, value FROM parse_cache ORDER BY last_used DESC LIMIT ?",
+                               (max_entries,)).fetchall()
+        for key, value in reversed(rows):
+            self.entries[key] = json.loads(value)
+
+    def get(self, text):
+        key = normalize_text(text)
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, text, value):
+        key = normalize_text(text)
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            evicted = []
+            while len(self.entries) > self.max_entries:
+                evicted.append(self.entries.popitem(last=False)[0])
+            with self.db:
+                self.db.execute("INSERT OR REPLACE INTO parse_cache VALUES (?, ?, ?)",
+                                (key, json.dumps(value), time.time()))
+                self.db.executemany("DELETE FROM parse_cache WHERE key = ?", [(k,) for k in evicted])
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,66 @@
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from sheet_sync import to_number
+
+
+class PRTracker:
+    """Heaviest weight per (exercise, rep count), kept in memory and persisted to SQLite.
+
+    Each logged set is checked and folded in with one dict lookup, so PR feedback never
+    rescans history. An empty table is seeded once from the existing history.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.db:
+            self.db.execute("""CREATE TABLE IF NOT EXISTS prs (
+                exercise TEXT, reps INTEGER, weight REAL, date TEXT, PRIMARY KEY (exercise, reps))""")
+        self.records = {(exercise, reps): weight
+                        for exercise, reps, weight in self.db.execute("SELECT exercise, reps, weight FROM prs")}
+
+    def is_empty(self):
+        return not self.records
+
+    def seed(self, df):
+        """Fill an empty table from the typed history frame."""
+        weight = pd.to_numeric(df['Weight'], errors='coerce')
+        reps = pd.to_numeric(df['Reps'], errors='coerce')
+        sets = pd.DataFrame({'Exercise': df['Exercise'].astype(str), 'Reps': reps, 'Weight': weight,
+                             'Date': df['Date'].astype(str)})
+        sets = sets[weight.notna() & (reps >= 1)].astype({'Reps': int})
+        best = sets.loc[sets.groupby(['Exercise', 'Reps'])['Weight'].idxmax()]
+        with self.lock:
+            if self.records:
+                return
+            self.records = {(e, r): w for e, r, w in zip(best['Exercise'], best['Reps'], best['Weight'])}
+            with self.db:
+                self.db.executemany("INSERT OR REPLACE INTO prs VALUES (?, ?, ?, ?)",
+                                    zip(best['Exercise'], best['Reps'].tolist(), best['Weight'].tolist(), best['Date']))
+
+    def record(self, exercise, reps, weight, date):
+        """Fold one set in. Returns the record it beat, or None if it isn't a PR.
+
+        The first set ever logged for an exercise and rep count sets the record quietly.
+        """
+        weight, reps = to_number(weight), to_number(reps)
+        if weight is None or reps is None or reps < 1:
+            return None
+        key = (exercise, int(reps))
+        with self.lock:
+            previous = self.records.get(key)
+            if previous is not None and weight <= previous:
+                return None
+            self.records[key] = weight
+            with self.db:
+                self.db.execute("INSERT OR REPLACE INTO prs VALUES (?, ?, ?, ?)", (exercise, key[1], weight, str(date)))
+        return previous
+
+    def best(self, exercise, reps):
+        with self.lock:
+            return self.records.get((exercise, int(reps)))
@@ -0,0 +1,39 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# A coach report stays valid this long for an unchanged training summary
+REPORT_TTL_SECONDS = 12 * 60 * 60
+
+
+def report_key(summary, model, user=""):
+    # The same numbers sent to a different model deserve a fresh opinion; athletes never share reports
+    return hashlib.sha256(f"{user}\n{model}\n{summary}".encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """(athlete, training summary, model) fingerprint -> generated report, persisted to SQLite with a TTL."""
+
+    def __init__(self, path, ttl=REPORT_TTL_SECONDS):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS reports (key TEXT PRIMARY KEY, report TEXT, created REAL)")
+
+    def get(self, summary, model, user=""):
+        """-> (report, created) or None when there is no fresh entry."""
+        with self.lock:
+            row = self.db.execute("SELECT report, created FROM reports WHERE key = ?",
+                                  (report_key(summary, model, user),)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return row
+
+    def put(self, summary, model, report, user=""):
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO reports VALUES (?, ?, ?)",
+                            (report_key(summary, model, user), report, time.time()))
+            self.db.execute("DELETE FROM reports WHERE created < ?", (time.time() - self.ttl,))
@@ -0,0 +1,398 @@
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import pandas as pd
+import pyarrow as pa
+from gspread.exceptions import APIError, SpreadsheetNotFound, WorksheetNotFound
+from gspread.utils import a1_range_to_grid_range
+
+# A full re-read every so often picks up rows that were edited or deleted by hand
+# in the sheet; everything in between is a tail read of newly appended rows.
+FULL_RESYNC_SECONDS = 15 * 60
+# Rows per range request when reading the sheet. Every request is paced by the shared
+# ~1 req/s quota bucket, so chunks are large: a 1M-set full pull is 11 requests instead
+# of 201, at the cost of holding up to 100k rows of raw strings (~50 MB) at a time.
+CHUNK_ROWS = 100_000
+# Versions come from one process-wide counter, so a mirror rebuilt after its cache entry was
+# evicted never reuses a version an earlier mirror stamped on a different frame
+_versions = itertools.count(1)
+
+
+CATEGORY_COLUMNS = ['Exercise', 'Muscle Group']
+NUMERIC_COLUMNS = ['Weight', 'Reps']
+
+
+def to_number(value):
+    """One cell as a float, or None if it isn't a finite number. The scalar twin of the
+    pd.to_numeric(errors='coerce') that normalize_rows() applies to a whole column."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def parse_dates(values):
+    dates = pd.to_datetime(values, format='%Y-%m-%d', errors='coerce')
+    # Rows typed into the sheet by hand may use another format; only those pay for a slow parse
+    retry = dates.isna() & values.astype(str).str.strip().ne('')
+    if retry.any():
+        dates[retry] = pd.to_datetime(values[retry], format='mixed', errors='coerce')
+    return dates
+
+
+def normalize_rows(df, canonicalize=None):
+    # Typed once at load: datetime Date, float32 Weight/Reps, categorical names
+    names = df['Exercise'].astype(str).str.strip()
+    if canonicalize is None:
+        df['Exercise'] = names.str.title()
+    else:
+        # Resolve each distinct spelling once and map, rather than per row
+        df['Exercise'] = names.map({name: canonicalize(name) for name in names.unique()})
+    if 'Muscle Group' not in df.columns: df['Muscle Group'] = 'Uncategorized'
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype(str).astype('category')
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns: df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+    if 'Date' in df.columns: df['Date'] = parse_dates(df['Date'])
+    return df
+
+
+def concat_rows(frames):
+    frames = [f for f in frames if not f.columns.empty]
+    if len(frames) <= 1:
+        return frames[0] if frames else pd.DataFrame()
+    # pd.concat falls back to object dtype when categories differ, so align them first;
+    # the first frame's codes stay as they are and later labels are appended after them.
+    for col in CATEGORY_COLUMNS:
+        if all(col in f.columns for f in frames):
+            categories = frames[0][col].cat.categories
+            for f in frames[1:]:
+                categories = categories.append(f[col].cat.categories.difference(categories))
+            frames = [f.assign(**{col: f[col].cat.set_categories(categories)}) for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def iter_row_chunks(sheet, start_row, chunk_rows=CHUNK_ROWS):
+    """Yield (first sheet row, rows) for consecutive bounded row ranges, e.g. "2:5001".
+
+    The API trims trailing empty rows, so a short chunk only means its last rows are blank;
+    rows cleared by hand can still have data after them. Reading stops at a range that comes
+    back entirely empty ([[]]) or at the end of the sheet's grid, when the handle knows it.
+    Only one chunk of raw strings is ever held at a time.
+    """
+    row_count = getattr(sheet, 'row_count', None)
+    while True:
+        end_row = start_row + chunk_rows - 1
+        rows = sheet.get(f"{start_row}:{end_row}")
+        while rows and not rows[-1]:
+            rows = rows[:-1]
+        if not rows:
+            return
+        yield start_row, rows
+        if row_count is not None and end_row >= row_count:
+            return
+        start_row += chunk_rows
+
+
+class WorksheetCache:
+    """Opened Spreadsheet/Worksheet handles keyed by title, so callers skip the metadata round trips.
+
+    A spreadsheet title is resolved to its key once (open-by-title is a Drive search);
+    after that handles are reopened by key whenever a call reports them stale.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.keys = {}          # spreadsheet title -> key
+        self.spreadsheets = {}  # spreadsheet title -> Spreadsheet
+        self.worksheets = {}    # (spreadsheet title, worksheet title) -> Worksheet
+        self.lock = threading.Lock()
+
+    def get(self, spreadsheet, worksheet):
+        with self.lock:
+            ws = self.worksheets.get((spreadsheet, worksheet))
+            if ws is None:
+                ws = self._open_spreadsheet(spreadsheet).worksheet(worksheet)
+                self.worksheets[(spreadsheet, worksheet)] = ws
+            return ws
+
+    def create(self, spreadsheet, worksheet, header):
+        """Add a worksheet with just a header row (or open it, if someone else just did)."""
+        with self.lock:
+            sh = self._open_spreadsheet(spreadsheet)
+            try:
+                ws = sh.add_worksheet(title=worksheet, rows=1000, cols=len(header))
+            except APIError as e:
+                if e.code != 400 or "already exists" not in str(e):
+                    raise
+                ws = sh.worksheet(worksheet)
+            # The tab may exist without its header (a header write that failed last time,
+            # or another session still between its two calls); writing A1 is idempotent.
+            if not ws.row_values(1):
+                ws.update([header], "A1")
+            self.worksheets[(spreadsheet, worksheet)] = ws
+            return ws
+
+    def invalidate(self, spreadsheet, worksheet=None, forget_key=False):
+        with self.lock:
+            self.spreadsheets.pop(spreadsheet, None)
+            for cached in [k for k in self.worksheets if k[0] == spreadsheet]:
+                if worksheet is None or cached[1] == worksheet:
+                    del self.worksheets[cached]
+            if forget_key:
+                self.keys.pop(spreadsheet, None)
+
+    def call(self, spreadsheet, worksheet, fn):
+        """Run fn(worksheet), reopening the handle and retrying once if it turned out stale."""
+        try:
+            return fn(self.get(spreadsheet, worksheet))
+        except (APIError, WorksheetNotFound) as e:
+            # Only 400 (range no longer parses, e.g. the tab was renamed) and 404 mean the
+            # handle is stale; anything else may have been applied and must not be replayed.
+            if isinstance(e, APIError) and e.code not in (400, 404):
+                raise
+            self.invalidate(spreadsheet, worksheet)
+            return fn(self.get(spreadsheet, worksheet))
+
+    def _open_spreadsheet(self, title):
+        sh = self.spreadsheets.get(title)
+        if sh is not None:
+            return sh
+        key = self.keys.get(title)
+        if key is not None:
+            try:
+                sh = self.client.open_by_key(key)
+            except (APIError, SpreadsheetNotFound):
+                self.keys.pop(title, None)  # deleted or unshared; fall back to a title search
+        if sh is None:
+            sh = self.client.open(title)
+            self.keys[title] = sh.id
+        self.spreadsheets[title] = sh
+        return sh
+
+
+def read_snapshot(path):
+    # Arrow IPC file, memory-mapped so the read cost is paging in columns, not parsing them.
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+        df = table.to_pandas()
+    meta = table.schema.metadata
+    return df, json.loads(meta[b'header']), int(meta[b'rows_synced'])
+
+
+def write_snapshot(df, header, rows_synced, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b'header': json.dumps(header).encode(),
+        b'rows_synced': str(rows_synced).encode(),
+    })
+    # Uncompressed so readers can memory-map it; written aside and swapped in so a
+    # crash mid-write never leaves a truncated snapshot behind.
+    tmp_path = path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one.
+
+    The first caller for a key runs fn; everyone who arrives while it is running waits
+    for that call and gets its result (or its exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+
+class SheetSync:
+    """In-memory mirror of a worksheet that only pulls rows appended since the last sync.
+
+    Listeners (objects with reset(df) and extend(new_rows)) are kept in step with the
+    mirror, so derived tables can be maintained incrementally instead of recomputed.
+    """
+
+    def __init__(self, snapshot_path=None, canonicalize=None, full_resync_seconds=FULL_RESYNC_SECONDS,
+                 chunk_rows=CHUNK_ROWS):
+        self.snapshot_path = snapshot_path
+        self.canonicalize = canonicalize
+        self.full_resync_seconds = full_resync_seconds
+        self.chunk_rows = chunk_rows
+        self.header = None
+        self.rows_synced = 0  # data rows (header excluded) already in self.df
+        self.last_full_pull = None
+        self.last_synced = None  # monotonic time the mirror was last confirmed against the sheet
+        self.last_error = None   # why the latest background refresh failed (None once one succeeds)
+        self.df = pd.DataFrame()
+        self.version = 0  # renewed on every change to self.df, and stamped into df.attrs
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.flight = SingleFlight()
+
+    def add_listener(self, listener):
+        with self.lock:
+            self.listeners.append(listener)
+            if self.header is not None:
+                listener.reset(self.df)
+
+    def sync(self, sheet):
+        # Sessions whose cached copy expires together all ask for the version they last saw;
+        # one of them reads the sheet and the rest share its result.
+        return self.flight.do(self.version, lambda: self._sync(sheet))
+
+    def _sync(self, sheet):
+        with self.lock:
+            stale = (self.last_full_pull is None
+                     or time.monotonic() - self.last_full_pull > self.full_resync_seconds)
+            if self.header is None or stale:
+                changed = self._full_pull(sheet)
+            else:
+                changed = self._tail_pull(sheet)
+            if changed:
+                self._save_snapshot()
+            self.last_synced = time.monotonic()
+            self.last_error = None
+            return self.df
+
+    def record_append(self, rows, updated_range=None):
+        """Write-through for rows this process just appended, so no sync has to read them back."""
+        with self.lock:
+            if self.header is None:
+                return False
+            if updated_range:
+                # e.g. "Exercises!A1202:F1204" -- if the rows didn't land right after our
+                # tail, someone else appended in between and the next tail read has to catch up.
+                grid = a1_range_to_grid_range(updated_range.split('!')[-1])
+                if grid.get('startRowIndex') != self.rows_synced + 1:
+                    return False
+            # Same shape the Sheets API hands back on a read: formatted strings.
+            new_rows = [[str(c) for c in r] for r in rows]
+            self._extend(self._to_frame(self.header, new_rows))
+            self.rows_synced += len(new_rows)
+            self._save_snapshot()
+            return True
+
+    def load_snapshot(self):
+        """Seed an empty mirror from the on-disk snapshot. Returns True if one was loaded."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        with self.lock:
+            if self.header is not None:
+                return False
+            try:
+                df, self.header, self.rows_synced = read_snapshot(self.snapshot_path)
+            except Exception:
+                return False
+            self._replace(df)
+            # Leave last_full_pull unset so the next sync reconciles with a full read.
+            return True
+
+    def age(self):
+        """Seconds since the last successful sync (inf if there hasn't been one)."""
+        if self.last_synced is None:
+            return float('inf')
+        return time.monotonic() - self.last_synced
+
+    def sync_in_background(self, refresh, on_done=None):
+        # refresh() runs the sync (e.g. through WorksheetCache.call, so stale handles are reopened).
+        # A failure is kept in last_error for the UI; on_done only fires when the mirror changed.
+        def run():
+            version = self.version
+            try:
+                refresh()
+            except Exception as e:
+                self.last_error = e
+                return
+            if on_done and self.version != version: on_done()
+        threading.Thread(target=run, daemon=True).start()
+
+    def _full_pull(self, sheet):
+        header, frames, rows_synced = None, [], 0
+        for first_row, rows in iter_row_chunks(sheet, 1, self.chunk_rows):
+            rows_synced = first_row + len(rows) - 2  # last data row; row 1 is the header
+            if header is None:
+                header, rows = rows[0], rows[1:]
+            # Each chunk is typed straight away, so its raw strings can be dropped. Blank
+            # rows still count towards the position but never become sets.
+            frames.append(self._to_frame(header, [r for r in rows if r]))
+        if header is None:
+            header = []
+            frames.append(self._to_frame(header, []))
+        # Build the frame before touching any state so a failed pull leaves the mirror as it was.
+        self._replace(concat_rows(frames))
+        self.header = header
+        self.rows_synced = rows_synced
+        self.last_full_pull = time.monotonic()
+        return True
+
+    def _tail_pull(self, sheet):
+        # Row ranges starting right after the known tail; data row N lives on sheet row N + 1.
+        frames, rows_synced = [], self.rows_synced
+        for first_row, rows in iter_row_chunks(sheet, self.rows_synced + 2, self.chunk_rows):
+            # An empty range comes back as [[]], not []: only rows with cells are new sets
+            filled = [r for r in rows if r]
+            if filled:
+                frames.append(self._to_frame(self.header, filled))
+                rows_synced = first_row + len(rows) - 2
+        if not frames:
+            return False
+        self._extend(concat_rows(frames))
+        self.rows_synced = rows_synced
+        return True
+
+    def _replace(self, df):
+        self.df = df
+        self.version = next(_versions)
+        self.df.attrs['version'] = self.version
+        for listener in self.listeners:
+            listener.reset(df)
+
+    def _extend(self, new_df):
+        self.df = concat_rows([self.df, new_df])
+        self.version = next(_versions)
+        self.df.attrs['version'] = self.version
+        for listener in self.listeners:
+            listener.extend(new_df)
+
+    def _save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        try:
+            write_snapshot(self.df, self.header, self.rows_synced, self.snapshot_path)
+        except Exception:
+            pass  # the snapshot is only a startup accelerator; the sheet stays the source of truth
+
+    def _to_frame(self, header, rows):
+        width = len(header)
+        # The Sheets API trims trailing empty cells, so pad ragged rows back out.
+        padded = [list(r[:width]) + [''] * (width - len(r)) for r in rows]
+        return normalize_rows(pd.DataFrame(padded, columns=header), self.canonicalize)
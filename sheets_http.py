@@ -0,0 +1,110 @@
+import random
+import threading
+import time
+from http import HTTPStatus
+
+import requests
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Returns the seconds spent waiting for a token
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class RateLimitedHTTPClient(HTTPClient):
+    """gspread HTTP client that paces requests and retries the ones the API asks us to repeat.
+
+    Every session in the process shares one service account and therefore one per-minute
+    Sheets quota, so all requests go through a token bucket sized just under it. 429s and
+    Drive's 403 usageLimits are retried with exponential backoff (honouring Retry-After).
+    408s, 5xx and dropped connections are only retried for reads: a POST such as
+    values:append may have been applied before it failed, and replaying it would write the
+    sets twice. Pass the class to gspread.authorize(..., http_client=...).
+    """
+
+    RATE = 0.9          # requests per second; the default Sheets quota is 60 per minute
+    BURST = 5
+    MAX_RETRIES = 5
+    BASE_DELAY = 1.0
+    MAX_DELAY = 64.0
+    # Safe to send again whatever happened to the first attempt
+    IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'DELETE'}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bucket = TokenBucket(self.RATE, self.BURST)
+        self.counters = {'requests': 0, 'retries': 0, 'errors': 0, 'throttled_seconds': 0.0}
+        self.counters_lock = threading.Lock()
+
+    def request(self, *args, **kwargs):
+        method = str(kwargs.get('method', args[0] if args else '')).upper()
+        attempt = 0
+        while True:
+            self._count('throttled_seconds', self.bucket.acquire())
+            self._count('requests')
+            try:
+                return super().request(*args, **kwargs)
+            except (APIError, requests.ConnectionError, requests.Timeout) as err:
+                if attempt >= self.MAX_RETRIES or not self._should_retry(err, method in self.IDEMPOTENT_METHODS):
+                    self._count('errors')
+                    raise
+                delay = self._retry_after(err) or min(self.BASE_DELAY * 2 ** attempt, self.MAX_DELAY)
+                delay *= random.uniform(1.0, 1.25)
+                attempt += 1
+                self._count('retries')
+                self._count('throttled_seconds', delay)
+                time.sleep(delay)
+
+    def stats(self):
+        with self.counters_lock:
+            return dict(self.counters)
+
+    def _count(self, name, amount=1):
+        with self.counters_lock:
+            self.counters[name] += amount
+
+    @staticmethod
+    def _should_retry(err, idempotent):
+        if isinstance(err, requests.ConnectTimeout):
+            return True  # never reached the server
+        if not isinstance(err, APIError):
+            return idempotent  # connection dropped or timed out, maybe after the request was applied
+        if err.code == HTTPStatus.TOO_MANY_REQUESTS:
+            return True  # rejected by the quota before doing anything
+        # Drive reports its rate limits as 403 with a usageLimits domain
+        errors = err.error.get('errors') or [{}]
+        if err.code == HTTPStatus.FORBIDDEN and errors[0].get('domain') == 'usageLimits':
+            return True
+        return idempotent and (err.code == HTTPStatus.REQUEST_TIMEOUT or err.code >= 500)
+
+    @staticmethod
+    def _retry_after(err):
+        if not isinstance(err, APIError):
+            return None
+        try:
+            return float(err.response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
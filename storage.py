@@ -0,0 +1,214 @@
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from gspread.exceptions import APIError, WorksheetNotFound
+
+from aggregates import DailyAggregates
+from sheet_sync import normalize_rows, parse_dates, to_number
+
+HEADER = ['Date', 'Exercise', 'Weight', 'Reps', 'Notes', 'Muscle Group']
+
+
+def filter_sets(df, muscle_group=None, exercise=None, since=None, until=None):
+    mask = pd.Series(True, index=df.index)
+    if muscle_group is not None: mask &= df['Muscle Group'] == muscle_group
+    if exercise is not None: mask &= df['Exercise'] == exercise
+    if since is not None: mask &= df['Date'] >= pd.Timestamp(since)
+    if until is not None: mask &= df['Date'] <= pd.Timestamp(until)
+    return df[mask]
+
+
+def rows_rejected(err):
+    """True when a backend refused the rows themselves, so sending them again can never work."""
+    # Sheets answers a malformed values:append with 400; SQLite can't bind a value it has no type for
+    return (isinstance(err, APIError) and err.code == 400) or isinstance(err, sqlite3.InterfaceError)
+
+
+def empty_sets():
+    # What a partition nobody has logged to yet loads as
+    df = normalize_rows(pd.DataFrame(columns=HEADER), canonicalize=str)
+    df.attrs['version'] = 0
+    return df
+
+
+class Storage:
+    """Where logged sets live. The app only talks to this interface.
+
+    load() returns the typed frame (version stamped in df.attrs), append_sets() takes rows
+    as [date, exercise, weight, reps, notes, muscle group], and the query/aggregate
+    methods back the STATS tab.
+    """
+
+    def load(self, on_refresh=None):
+        raise NotImplementedError
+
+    def append_sets(self, rows):
+        raise NotImplementedError
+
+    def query(self, muscle_group=None, exercise=None, since=None, until=None):
+        raise NotImplementedError
+
+    def daily_progress(self, muscle_group, exercise):
+        """Date, Weight (max), Volume, Sets for one movement, oldest first."""
+        raise NotImplementedError
+
+    def all_time_best(self, muscle_group, exercise):
+        raise NotImplementedError
+
+    def refresh_error(self):
+        """(error, seconds since the data was last confirmed) if refreshing it failed, else None."""
+        return None
+
+
+class SheetsStorage(Storage):
+    """The "Exercises" worksheet, read through the incremental SheetSync mirror.
+
+    With stale_while_revalidate, load() never waits on the sheet once the mirror holds
+    data: it returns the current frame and, if that is older than revalidate_after
+    seconds, refreshes it off-thread and calls on_refresh when a new version lands.
+    With create_missing, a worksheet that doesn't exist yet loads as empty and is only
+    added by the first append_sets(), so browsing an athlete never creates their tab.
+    `sync` belongs to this storage alone: its daily table listens to it for the mirror's life.
+    """
+
+    def __init__(self, worksheets, sync, spreadsheet="My Workout DB", worksheet="Exercises",
+                 stale_while_revalidate=False, revalidate_after=30, create_missing=False):
+        self.worksheets = worksheets
+        self.sync = sync
+        self.spreadsheet = spreadsheet
+        self.worksheet = worksheet
+        self.stale_while_revalidate = stale_while_revalidate
+        self.revalidate_after = revalidate_after
+        self.create_missing = create_missing
+        # Exercise x date table kept in step with the mirror as rows are appended
+        self.daily = DailyAggregates()
+        sync.add_listener(self.daily)
+
+    def load(self, on_refresh=None):
+        # Cold start: paint from the local snapshot and reconcile with the sheet off-thread
+        if self.sync.header is None and self.sync.load_snapshot():
+            self._revalidate(on_refresh)
+            return self.sync.df
+        if self.stale_while_revalidate and self.sync.header is not None:
+            if self.sync.age() >= self.revalidate_after:
+                self._revalidate(on_refresh)
+            # The mirror swaps in a whole new frame on every change, so this one stays consistent
+            return self.sync.df
+        try:
+            return self._call(self.sync.sync)
+        except WorksheetNotFound:
+            if not self.create_missing:
+                raise
+            return empty_sets()
+
+    def append_sets(self, rows):
+        response = self._call(lambda ex_sheet: ex_sheet.append_rows(rows), create=True)
+        # Write-through: merge the new rows into the mirror so no read has to fetch them back
+        self.sync.record_append(rows, response.get('updates', {}).get('updatedRange'))
+
+    def query(self, muscle_group=None, exercise=None, since=None, until=None):
+        return filter_sets(self.sync.df, muscle_group, exercise, since, until)
+
+    def daily_progress(self, muscle_group, exercise):
+        return self.daily.progress(muscle_group, exercise)
+
+    def all_time_best(self, muscle_group, exercise):
+        return self.daily.all_time_best(muscle_group, exercise)
+
+    def refresh_error(self):
+        error = self.sync.last_error
+        return None if error is None else (error, self.sync.age())
+
+    def _revalidate(self, on_refresh):
+        self.sync.sync_in_background(lambda: self._call(self.sync.sync), on_done=on_refresh)
+
+    def _call(self, fn, create=False):
+        try:
+            return self.worksheets.call(self.spreadsheet, self.worksheet, fn)
+        except WorksheetNotFound:
+            if not (create and self.create_missing):
+                raise
+            self.worksheets.create(self.spreadsheet, self.worksheet, HEADER)
+            return self.worksheets.call(self.spreadsheet, self.worksheet, fn)
+
+
+class SQLiteStorage(Storage):
+    """Local single-file store with (exercise, date) and (muscle_group, date) indexes.
+
+    No API quota and no network, which also makes it the backend for running offline.
+    The file is only created by the first append_sets(); until then every read is empty.
+    """
+
+    SELECT = ("SELECT date AS Date, exercise AS Exercise, weight AS Weight, reps AS Reps, "
+              "notes AS Notes, muscle_group AS \"Muscle Group\" FROM sets")
+
+    def __init__(self, path):
+        self.path = path
+        self.db = None
+        self.lock = threading.Lock()
+
+    def load(self, on_refresh=None):
+        with self.lock:
+            if self._connect() is None:
+                return empty_sets()
+            df = pd.read_sql_query(self.SELECT + " ORDER BY id", self.db)
+            version = self.db.execute("SELECT COALESCE(MAX(id), 0) FROM sets").fetchone()[0]
+        # Names were canonicalized on the way in, so keep them exactly as stored
+        df = normalize_rows(df, canonicalize=str)
+        df.attrs['version'] = version
+        return df
+
+    def append_sets(self, rows):
+        values = [(str(date), exercise, to_number(weight), to_number(reps), notes, group)
+                  for date, exercise, weight, reps, notes, group in rows]
+        with self.lock, self._connect(create=True):
+            self.db.executemany("INSERT INTO sets (date, exercise, weight, reps, notes, muscle_group) "
+                                "VALUES (?, ?, ?, ?, ?, ?)", values)
+
+    def query(self, muscle_group=None, exercise=None, since=None, until=None):
+        where, params = [], []
+        if muscle_group is not None: where.append("muscle_group = ?"); params.append(muscle_group)
+        if exercise is not None: where.append("exercise = ?"); params.append(exercise)
+        if since is not None: where.append("date >= ?"); params.append(pd.Timestamp(since).strftime("%Y-%m-%d"))
+        if until is not None: where.append("date <= ?"); params.append(pd.Timestamp(until).strftime("%Y-%m-%d"))
+        sql = self.SELECT + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY date, id"
+        with self.lock:
+            if self._connect() is None:
+                return empty_sets()
+            df = pd.read_sql_query(sql, self.db, params=params)
+        return normalize_rows(df, canonicalize=str)
+
+    def daily_progress(self, muscle_group, exercise):
+        with self.lock:
+            rows = [] if self._connect() is None else self.db.execute(
+                "SELECT date, MAX(weight), SUM(COALESCE(weight * reps, 0)), COUNT(*) FROM sets "
+                "WHERE exercise = ? AND muscle_group = ? GROUP BY date ORDER BY date",
+                (exercise, muscle_group)).fetchall()
+        progress = pd.DataFrame(rows, columns=['Date', 'Weight', 'Volume', 'Sets'])
+        progress['Date'] = parse_dates(progress['Date'])
+        return progress
+
+    def all_time_best(self, muscle_group, exercise):
+        with self.lock:
+            if self._connect() is None:
+                return None
+            return self.db.execute("SELECT MAX(weight) FROM sets WHERE exercise = ? AND muscle_group = ?",
+                                   (exercise, muscle_group)).fetchone()[0]
+
+    def _connect(self, create=False):
+        # Called under self.lock. -> the connection, or None while the file doesn't exist
+        if self.db is None and (create or os.path.exists(self.path)):
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            with db:
+                db.execute("""CREATE TABLE IF NOT EXISTS sets (
+                    id INTEGER PRIMARY KEY, date TEXT, exercise TEXT, weight REAL, reps REAL,
+                    notes TEXT, muscle_group TEXT)""")
+                db.execute("CREATE INDEX IF NOT EXISTS idx_sets_exercise_date ON sets (exercise, date)")
+                db.execute("CREATE INDEX IF NOT EXISTS idx_sets_group_date ON sets (muscle_group, date)")
+            self.db = db
+        return self.db
+
@@ -0,0 +1,147 @@
+import json
+import math
+
+import google.generativeai as genai
+
+from fast_parser import MUSCLE_GROUPS, fast_parse
+
+
+PARSER_MODEL = 'models/gemini-2.5-flash'
+
+
+NAMING_RULES = f"""
+        CRITICAL NAMING RULES:
+        1. "exercise": Distinguish Equipment (Barbell/Dumbbell) and Angle (Flat/Incline/Decline).
+        2. "muscle_group": MUST be one of: [{", ".join(MUSCLE_GROUPS)}].
+        
+        EXAMPLES:
+        - "bench" -> "Flat Barbell Bench Press"
+        - "incline db" -> "Incline Dumbbell Press"
+        - "squat" -> "Barbell Back Squat"
+"""
+
+
+def ask_model(prompt):
+    model = genai.GenerativeModel(PARSER_MODEL)
+    response = model.generate_content(prompt)
+    cleaned_text = response.text.replace("```json", "").replace("```", "").strip()
+    return json.loads(cleaned_text)
+
+
+def valid_sets(parsed):
+    # What the rest of the pipeline relies on: a non-empty list of dicts naming an exercise
+    return (isinstance(parsed, list) and len(parsed) > 0
+            and all(isinstance(item, dict) and item.get('exercise') for item in parsed))
+
+
+def _cell(value):
+    # Model output lands in a sheet row, where a cell can only hold a string, number or bool;
+    # anything else (e.g. "weight": [80, 85]) would be refused on every retry, so keep it as text
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return json.dumps(value)
+
+
+def parse_workout(text, cache=None, exercise_index=None):
+    return parse_workouts([text], cache, exercise_index)[0]
+
+
+def parse_workouts(texts, cache=None, exercise_index=None):
+    # One result per text (a list of sets, or None if it couldn't be parsed)
+    results = [None] * len(texts)
+    pending = []
+    for i, text in enumerate(texts):
+        # Regular entries ("bench 80kg 5 reps") never need the model
+        parsed = fast_parse(text, exercise_index.lookup if exercise_index else None)
+        # Everything else is memoized, so a repeated free-text line is only ever sent once
+        if parsed is None and cache is not None:
+            parsed = cache.get(text)
+            if not valid_sets(parsed): parsed = None
+        if parsed is None:
+            pending.append(i)
+        results[i] = parsed
+
+    if len(pending) > 1:
+        # Several entries arrived together: one prompt for all of them
+        try:
+            entries = "\n".join(f'{n + 1}. "{texts[i]}"' for n, i in enumerate(pending))
+            prompt = f"""
+        You are a strict Gym Data Manager. Convert each of these {len(pending)} numbered log entries into JSON:
+        {entries}
+        {NAMING_RULES}
+        Output a JSON list with exactly {len(pending)} elements, one per entry and in the same order.
+        Each element is a JSON list with keys: exercise, muscle_group, weight, reps, notes.
+        """
+            batch = ask_model(prompt)
+            if not isinstance(batch, list) or len(batch) != len(pending): raise ValueError("batch size mismatch")
+            # A malformed element only sends its own entry back through the per-entry prompt
+            retry = []
+            for i, parsed in zip(pending, batch):
+                if not valid_sets(parsed):
+                    retry.append(i)
+                    continue
+                results[i] = parsed
+                if cache is not None: cache.put(texts[i], parsed)
+            pending = retry
+        except:
+            pass  # fall back to one prompt per entry
+
+    for i in pending:
+        try:
+            prompt = f"""
+        You are a strict Gym Data Manager. Convert this text: "{texts[i]}" into JSON.
+        {NAMING_RULES}
+        Output JSON list with keys: exercise, muscle_group, weight, reps, notes.
+        """
+            parsed = ask_model(prompt)
+            results[i] = parsed if valid_sets(parsed) else None
+            if cache is not None and results[i] is not None: cache.put(texts[i], parsed)
+        except:
+            results[i] = None
+    return results
+
+
+def log_workouts(entries, parse_cache, exercise_index):
+    # entries: [(text, date_only, journal, pr_tracker)] -> one workout_data (or None) per entry
+    parsed = parse_workouts([entry[0] for entry in entries], parse_cache, exercise_index)
+
+    results = []
+    rows = {}    # journal -> rows for that athlete
+    logged = {}  # journal -> [(pr_tracker, date, item)], checked for PRs once the rows are saved
+    for (text, date_only, journal, pr_tracker), workout_data in zip(entries, parsed):
+        if not workout_data:
+            results.append(None)
+            continue
+
+        # Collapse the model's spelling onto the canonical name (and group) via the alias index
+        workout_data = [dict(item) for item in workout_data]
+        for item in workout_data:
+            exercise, group = exercise_index.resolve(_cell(item.get('exercise', 'Unknown')),
+                                                     _cell(item.get('muscle_group')))
+            item['exercise'] = exercise
+            item['muscle_group'] = group or 'Other'
+            for key in ('weight', 'reps', 'notes'):
+                if key in item: item[key] = _cell(item[key])
+
+        for item in workout_data:
+            logged.setdefault(journal, []).append((pr_tracker, date_only, item))
+            rows.setdefault(journal, []).append([
+                date_only, 
+                item['exercise'],
+                item.get('weight', 0),
+                item.get('reps', 0),
+                item.get('notes', ''),
+                item['muscle_group']
+            ])
+        results.append(workout_data)
+
+    for journal, journal_rows in rows.items():
+        journal.append(journal_rows)
+        for pr_tracker, date_only, item in logged[journal]:
+            if pr_tracker is None:
+                continue
+            previous = pr_tracker.record(item['exercise'], item.get('reps'), item.get('weight'), date_only)
+            if previous is not None: item['previous_best'] = previous
+    return results